@@ -0,0 +1,187 @@
+import numpy as np
+
+from board import Board
+from const import *
+from pos2d import Pos2D
+
+class BatchBoard:
+    '''
+    Lot de N plateaux de même taille avancés en parallèle, stockés dans un tableau
+    NumPy (N, m, n) d'entiers int8 (EMPTY, PLAYER1 ou PLAYER2). Les coups légaux de
+    tous les plateaux sont calculés par décalages de tableaux et un coup par plateau
+    est appliqué en une seule opération vectorisée : on peut ainsi simuler des
+    milliers de parties en même temps.
+
+    Args:
+        count (int): nombre de plateaux
+        rows (int): nombre de lignes de chaque plateau
+        cols (int): nombre de colonnes de chaque plateau
+
+    Attributes:
+        cells (np.ndarray): contenu des plateaux, de forme (N, m, n)
+        winners (np.ndarray): vainqueur de chaque plateau (0 si la partie continue)
+        plies (np.ndarray): nombre de coups joués sur chaque plateau
+        count (int): nombre de plateaux
+        m (int): nombre de lignes de chaque plateau
+        n (int): nombre de colonnes de chaque plateau
+    '''
+    def __init__(self, count, rows, cols):
+        self.cells_ = np.zeros((count, rows, cols), dtype=np.int8)
+        self.winners_ = np.zeros(count, dtype=np.int8)
+        self.plies_ = np.zeros(count, dtype=np.int32)
+
+    @classmethod
+    def from_board(cls, board, count):
+        '''
+        Construit un lot de plateaux identiques à un plateau donné.
+
+        Args:
+            board (Board): plateau à reproduire
+            count (int): nombre de copies
+
+        Returns:
+            BatchBoard: lot de `count` plateaux
+        '''
+        batch = cls(count, board.m, board.n)
+        for player, pegs in ((PLAYER1, board.pegs[0]), (PLAYER2, board.pegs[1])):
+            for pos in pegs:
+                batch.cells_[:, pos.row, pos.col] = player
+        return batch
+
+    @property
+    def cells(self):
+        return self.cells_
+
+    @property
+    def winners(self):
+        return self.winners_
+
+    @property
+    def plies(self):
+        return self.plies_
+
+    @property
+    def count(self):
+        return self.cells_.shape[0]
+
+    @property
+    def m(self):
+        return self.cells_.shape[1]
+
+    @property
+    def n(self):
+        return self.cells_.shape[2]
+
+    def board(self, idx):
+        '''
+        Reconstruit un plateau du lot sous forme de Board.
+
+        Args:
+            idx (int): indice du plateau dans le lot
+
+        Returns:
+            Board: plateau correspondant (sans historique)
+        '''
+        board = Board(self.m, self.n)
+        for i, j in zip(*np.nonzero(self.cells_[idx] == PLAYER1)):
+            board.add_white_peg(Pos2D(int(i), int(j)))
+        for i, j in zip(*np.nonzero(self.cells_[idx] == PLAYER2)):
+            board.add_black_peg(Pos2D(int(i), int(j)))
+        return board
+
+    def legal_moves(self, player):
+        '''
+        Calcule les coups légaux d'un joueur sur tous les plateaux à la fois.
+
+        Args:
+            player (int): PLAYER1 ou PLAYER2
+
+        Returns:
+            np.ndarray:
+                masque booléen (N, 3, m, n) : [b, d, i, j] est vrai si le pion en
+                (i, j) du plateau b peut se déplacer dans la direction d (dans
+                l'ordre de VALID_MOVES : diagonale gauche, tout droit, diagonale
+                droite). Les plateaux dont la partie est finie n'ont aucun coup.
+        '''
+        cells = self.cells_
+        own = cells == player
+        empty = cells == EMPTY
+        free = ~own
+        mask = np.zeros((self.count, 3) + cells.shape[1:], dtype=bool)
+        if player == PLAYER1:  # vers la ligne 0
+            mask[:, 0, 1:, 1:] = own[:, 1:, 1:] & free[:, :-1, :-1]
+            mask[:, 1, 1:, :] = own[:, 1:, :] & empty[:, :-1, :]
+            mask[:, 2, 1:, :-1] = own[:, 1:, :-1] & free[:, :-1, 1:]
+        else:  # vers la ligne m-1
+            mask[:, 0, :-1, 1:] = own[:, :-1, 1:] & free[:, 1:, :-1]
+            mask[:, 1, :-1, :] = own[:, :-1, :] & empty[:, 1:, :]
+            mask[:, 2, :-1, :-1] = own[:, :-1, :-1] & free[:, 1:, 1:]
+        mask[self.winners_ != 0] = False
+        return mask
+
+    def random_moves(self, player, rng):
+        '''
+        Tire uniformément un coup légal par plateau.
+
+        Args:
+            player (int): PLAYER1 ou PLAYER2
+            rng (np.random.Generator): générateur aléatoire
+
+        Returns:
+            np.ndarray:
+                indice aplati (d, i, j) du coup choisi sur chaque plateau,
+                -1 si le plateau n'a aucun coup légal
+        '''
+        flat = self.legal_moves(player).reshape(self.count, -1)
+        counts = flat.sum(axis=1)
+        # on tire le r-ème coup légal de chaque plateau, r uniforme dans [0, counts)
+        r = (rng.random(self.count) * counts).astype(np.int64)
+        choices = np.argmax(np.cumsum(flat, axis=1) > r[:, None], axis=1)
+        return np.where(counts > 0, choices, -1)
+
+    def apply(self, player, moves):
+        '''
+        Applique un coup sur chaque plateau et met à jour les vainqueurs comme
+        Board.winner : le joueur gagne s'il atteint la ligne d'arrivée ou si
+        l'adversaire n'a plus de pion. Un plateau en cours sans coup légal est
+        perdu par `player` (forfait).
+
+        Args:
+            player (int): joueur effectuant les coups
+            moves (np.ndarray): indices aplatis renvoyés par random_moves
+        '''
+        m, n = self.m, self.n
+        playing = self.winners_ == 0
+        self.winners_[playing & (moves < 0)] = (PLAYER1+PLAYER2)-player
+        active = np.nonzero(playing & (moves >= 0))[0]
+        direction, square = np.divmod(moves[active], m*n)
+        i, j = np.divmod(square, n)
+        dest_i = i + (-1 if player == PLAYER1 else 1)
+        dest_j = j + direction - 1
+        self.cells_[active, i, j] = EMPTY
+        self.cells_[active, dest_i, dest_j] = player
+        self.plies_[active] += 1
+        goal_row = 0 if player == PLAYER1 else m-1
+        enemy = (PLAYER1+PLAYER2)-player
+        no_enemy = ~(self.cells_[active] == enemy).any(axis=(1, 2))
+        self.winners_[active[(dest_i == goal_row) | no_enemy]] = player
+
+    def random_playouts(self, player, rng, max_plies=None):
+        '''
+        Joue des coups aléatoires sur tous les plateaux jusqu'à la fin de toutes
+        les parties.
+
+        Args:
+            player (int): joueur devant jouer le premier coup
+            rng (np.random.Generator): générateur aléatoire
+            max_plies (int): nombre maximal de coups par plateau (None : pas de limite)
+
+        Returns:
+            np.ndarray: vainqueur de chaque plateau (0 si la limite a été atteinte)
+        '''
+        plies = 0
+        while (self.winners_ == 0).any() and (max_plies is None or plies < max_plies):
+            self.apply(player, self.random_moves(player, rng))
+            player = (PLAYER1+PLAYER2)-player
+            plies += 1
+        return self.winners_
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+'''
+Mesures de performance des chemins critiques : génération de coups (perft),
+move/undo, recherche minimax et simulations Monte-Carlo.
+
+Usage : python benchmark.py [--depth 4] [--output benchmark.json] [--compare ancien.json]
+
+Les résultats sont écrits au format JSON pour comparer deux commits. Les nombres
+de positions de perft sont identiques pour toutes les représentations du plateau :
+une différence signale une erreur dans la génération de coups.
+'''
+import argparse
+import json
+import subprocess
+import time
+from platform import python_version
+
+from bitboard import BitBoard
+from board import Board, TrackedBoard
+from const import *
+from mcts import UctSearch
+from players import MinimaxAiPlayer
+from pos2d import Pos2D
+
+BOARD_TYPES = {
+    'Board': Board,
+    'TrackedBoard': TrackedBoard,
+    'BitBoard': BitBoard,
+}
+
+# nombres de positions connus depuis la position de départ (PLAYER1 joue)
+EXPECTED_PERFT = {
+    6: [16, 256, 4308, 71478, 1248290],
+    8: [22, 484, 11132, 256036, 6182818],
+}
+
+def make_board(board_type, size):
+    '''
+    Construit le plateau de départ carré size x size (2 lignes de pions par joueur).
+
+    Args:
+        board_type (type): représentation du plateau
+        size (int): taille du plateau
+
+    Returns:
+        Board: plateau de départ
+    '''
+    board = board_type(size, size)
+    for i in range(2):
+        for j in range(size):
+            board.add_white_peg(Pos2D(size-1-i, j))
+            board.add_black_peg(Pos2D(i, j))
+    return board
+
+def perft(board, depth, player):
+    '''
+    Compte les positions atteignables en exactement `depth` coups (les parties
+    terminées avant ne sont pas prolongées).
+
+    Args:
+        board (Board): plateau de départ (laissé inchangé)
+        depth (int): nombre de coups
+        player (int): joueur devant jouer
+
+    Returns:
+        int: nombre de feuilles de l'arbre de jeu
+    '''
+    if depth == 0 or board.winner is not None:
+        return 1 if depth == 0 else 0
+    moves = board.possible_moves(player)
+    if depth == 1:
+        return len(moves)
+    total = 0
+    other = (PLAYER1+PLAYER2)-player
+    for move in moves:
+        board.move(move)
+        total += perft(board, depth-1, other)
+        board.undo()
+    return total
+
+def bench_perft(board_type, size, max_depth):
+    '''
+    Args:
+        board_type (type): représentation du plateau
+        size (int): taille du plateau
+        max_depth (int): profondeur maximale
+
+    Returns:
+        List[Dict]: nombre de positions, durée et positions/s pour chaque profondeur
+    '''
+    results = []
+    board = make_board(board_type, size)
+    for depth in range(1, max_depth+1):
+        start = time.perf_counter()
+        nodes = perft(board, depth, PLAYER1)
+        elapsed = time.perf_counter() - start
+        results.append({
+            'depth': depth,
+            'nodes': nodes,
+            'seconds': elapsed,
+            'nodes_per_s': nodes/elapsed if elapsed else 0.,
+        })
+    return results
+
+def bench_move_undo(board_type, size, repeat):
+    '''
+    Args:
+        board_type (type): représentation du plateau
+        size (int): taille du plateau
+        repeat (int): nombre de passages sur tous les coups de la position de départ
+
+    Returns:
+        Dict: nombre de paires move/undo par seconde
+    '''
+    board = make_board(board_type, size)
+    moves = board.possible_moves(PLAYER1)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for move in moves:
+            board.move(move)
+            board.undo()
+    elapsed = time.perf_counter() - start
+    return {'pairs_per_s': repeat*len(moves)/elapsed}
+
+def bench_minimax(board_type, size, depth):
+    '''
+    Args:
+        board_type (type): représentation du plateau
+        size (int): taille du plateau
+        depth (int): profondeur de la recherche alpha-beta
+
+    Returns:
+        Dict: noeuds visités, durée et noeuds/s
+    '''
+    board = make_board(board_type, size)
+    player = MinimaxAiPlayer(PLAYER1, board, depth=depth)
+    start = time.perf_counter()
+    player.alphabeta(depth)
+    elapsed = time.perf_counter() - start
+    return {
+        'depth': depth,
+        'nodes': player.nodes_,
+        'seconds': elapsed,
+        'nodes_per_s': player.nodes_/elapsed,
+    }
+
+def bench_montecarlo(board_type, size, seconds):
+    '''
+    Args:
+        board_type (type): représentation du plateau
+        size (int): taille du plateau
+        seconds (float): durée de la recherche
+
+    Returns:
+        Dict: simulations effectuées et simulations/s
+    '''
+    board = make_board(board_type, size)
+    search = UctSearch(PLAYER1)
+    start = time.perf_counter()
+    search.run(board, seconds)
+    elapsed = time.perf_counter() - start
+    return {
+        'rollouts': search.simulations,
+        'rollouts_per_s': search.simulations/elapsed,
+    }
+
+def git_revision():
+    '''
+    Returns:
+        str: commit courant (None si indisponible)
+    '''
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run(sizes, max_depth, minimax_depth, mc_seconds, repeat):
+    '''
+    Lance toutes les mesures sur toutes les représentations et tailles.
+
+    Returns:
+        Dict: résultats, prêts à être écrits en JSON
+    '''
+    results = {
+        'revision': git_revision(),
+        'python': python_version(),
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'benchmarks': {},
+        'perft_mismatches': [],
+    }
+    for size in sizes:
+        reference = None
+        for name, board_type in BOARD_TYPES.items():
+            key = f'{name}/{size}x{size}'
+            entry = {
+                'perft': bench_perft(board_type, size, max_depth),
+                'move_undo': bench_move_undo(board_type, size, repeat),
+                'minimax': bench_minimax(board_type, size, minimax_depth),
+                'montecarlo': bench_montecarlo(board_type, size, mc_seconds),
+            }
+            counts = [r['nodes'] for r in entry['perft']]
+            if reference is None:
+                reference = EXPECTED_PERFT.get(size, counts)[:len(counts)]
+            if counts != reference:
+                results['perft_mismatches'].append(key)
+            results['benchmarks'][key] = entry
+    return results
+
+def compare(old, new):
+    '''
+    Affiche le rapport des débits entre deux exécutions.
+
+    Args:
+        old (Dict): résultats de référence
+        new (Dict): nouveaux résultats
+    '''
+    for key, entry in new['benchmarks'].items():
+        if key not in old['benchmarks']:
+            continue
+        previous = old['benchmarks'][key]
+        ratios = {
+            'perft': entry['perft'][-1]['nodes_per_s'] / previous['perft'][-1]['nodes_per_s'],
+            'move_undo': entry['move_undo']['pairs_per_s'] / previous['move_undo']['pairs_per_s'],
+            'minimax': entry['minimax']['nodes_per_s'] / previous['minimax']['nodes_per_s'],
+            'montecarlo': entry['montecarlo']['rollouts_per_s'] / previous['montecarlo']['rollouts_per_s'],
+        }
+        print(key, ' '.join(f'{name}: x{ratio:.2f}' for name, ratio in ratios.items()))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--depth', type=int, default=4, help='profondeur maximale de perft')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[DEFAULT_SIZE, 8])
+    parser.add_argument('--minimax-depth', type=int, default=4)
+    parser.add_argument('--mc-seconds', type=float, default=2.)
+    parser.add_argument('--repeat', type=int, default=1000)
+    parser.add_argument('--output', default='benchmark.json')
+    parser.add_argument('--compare', default=None, help='résultats de référence (JSON)')
+    args = parser.parse_args()
+    results = run(args.sizes, args.depth, args.minimax_depth, args.mc_seconds, args.repeat)
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    for key, entry in results['benchmarks'].items():
+        print(key, 'perft', [r['nodes'] for r in entry['perft']],
+              f"move/undo {entry['move_undo']['pairs_per_s']:.0f}/s",
+              f"minimax {entry['minimax']['nodes_per_s']:.0f} noeuds/s",
+              f"montecarlo {entry['montecarlo']['rollouts_per_s']:.0f} simulations/s")
+    if results['perft_mismatches']:
+        print('ERREUR perft :', ', '.join(results['perft_mismatches']))
+    if args.compare is not None:
+        with open(args.compare) as f:
+            compare(json.load(f), results)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,426 @@
+from board import HistoryEntry
+from const import *
+from errors import *
+from move import Move
+from pos2d import Pos2D
+from zobrist import zobrist_keys
+
+class BitBoard:
+    '''
+    Plateau de jeu représenté par un masque de bits par joueur.
+    La case (i, j) correspond au bit d'indice i*n + j. Offre la même interface que
+    Board (possible_moves, move, undo, winner, check_integrity, ...) si bien que
+    les joueurs AI peuvent utiliser l'une ou l'autre représentation.
+
+    Args:
+        rows (int): nombre de lignes du plateau
+        cols (int): nombre de colonnes du plateau
+
+    Attributes:
+        bits (List[int]): masques des pions blancs et noirs
+        history (List[HistoryEntry]): historique des coups joués sur le plateau
+        key (int): clé de Zobrist de la position (pions et parité du nombre de coups)
+        evaluator (Evaluator): évaluation statique tenue à jour (None si aucune)
+        pegs (List[List[Pos2D]]): liste des pions blancs et noirs
+        last_move (HistoryEntry): dernier coup présent dans l'historique
+        m (int): nombre de lignes du plateau
+        n (int): nombre de colonnes du plateau
+        nb_pegs (int): nombre de pions restant sur le plateau, tous joueurs confondus
+        winner (int): PLAYER1 si le joueur 1 a gagné la partie,
+                      PLAYER2 si le joueur 2 a gagné
+                      et None si la partie n'est pas finie
+    '''
+    def __init__(self, rows, cols):
+        self.m_ = rows
+        self.n_ = cols
+        self.bits_ = [0, 0]
+        self.history_ = []
+        first_col = 0
+        for i in range(rows):
+            first_col |= 1 << (i*cols)
+        self.full_ = (1 << (rows*cols)) - 1
+        self.not_first_col_ = self.full_ & ~first_col
+        self.not_last_col_ = self.full_ & ~(first_col << (cols-1))
+        self.squares_ = Pos2D.squares(rows, cols)
+        self.zobrist_, self.zobrist_side_ = zobrist_keys(rows, cols)
+        self.key_ = 0
+        self.evaluator_ = None
+
+    @property
+    def m(self):
+        return self.m_
+
+    @property
+    def n(self):
+        return self.n_
+
+    @property
+    def bits(self):
+        return self.bits_
+
+    @property
+    def history(self):
+        return self.history_
+
+    @property
+    def key(self):
+        return self.key_
+
+    @property
+    def evaluator(self):
+        return self.evaluator_
+
+    def attach_evaluator(self, evaluator):
+        '''
+        Associe au plateau une évaluation statique, tenue à jour à chaque coup.
+
+        Args:
+            evaluator (Evaluator): évaluateur à associer (None pour le retirer)
+        '''
+        self.evaluator_ = evaluator
+        if evaluator is None:
+            return
+        evaluator.reset(self.m, self.n)
+        for player, pegs in ((PLAYER1, self.pegs[0]), (PLAYER2, self.pegs[1])):
+            for pos in pegs:
+                evaluator.add_peg(pos.row*self.n + pos.col, player)
+
+    def __hash__(self):
+        return self.key_
+
+    def __eq__(self, other):
+        return isinstance(other, BitBoard) and self.key_ == other.key_ \
+           and self.bits_ == other.bits_
+
+    @property
+    def nb_pegs(self):
+        return bin(self.bits_[0]).count('1') + bin(self.bits_[1]).count('1')
+
+    @property
+    def pegs(self):
+        return [list(self.__squares_of(bits)) for bits in self.bits_]
+
+    def __index(self, pos):
+        '''
+        Convertit une position en indice de bit.
+
+        Args:
+            pos (Pos2D): position sur le plateau
+
+        Returns:
+            int: indice du bit associé à pos
+
+        Raises:
+            InvalidPositionError: si pos est en dehors du plateau
+        '''
+        if not self.is_valid_pos(pos):
+            raise InvalidPositionError(
+                f'Position invalide dans un plateau de taille {(self.m_, self.n_)}: {pos}'
+            )
+        return pos.row*self.n_ + pos.col
+
+    def __squares_of(self, bits):
+        '''
+        Énumère les positions des bits à 1 d'un masque.
+
+        Args:
+            bits (int): masque de cases
+
+        Returns:
+            Iterator[Pos2D]: générateur des positions correspondantes
+        '''
+        while bits:
+            low = bits & -bits
+            yield self.squares_[low.bit_length()-1]
+            bits ^= low
+
+    def is_valid_pos(self, pos):
+        '''
+        Vérifie si une position donnée est sur le plateau.
+
+        Args:
+            pos (Pos2D): position à vérifier
+
+        Returns:
+            bool: True si la position est valide et False sinon
+        '''
+        return 0 <= pos.row < self.m_ and 0 <= pos.col < self.n_
+
+    def owner(self, pos):
+        '''
+        Détermine à qui appartient la case donnée.
+
+        Args:
+            pos (Pos2D): position sur le plateau
+
+        Returns:
+            int: EMPTY, PLAYER1 ou PLAYER2
+        '''
+        bit = 1 << self.__index(pos)
+        return PLAYER1 if self.bits_[0] & bit \
+          else PLAYER2 if self.bits_[1] & bit \
+          else EMPTY
+
+    def add_white_peg(self, pos):
+        '''
+        Ajoute un pion au joueur blanc à la position donnée.
+
+        Args:
+            pos (Pos2D): position à laquelle ajouter le pion
+        '''
+        self.__add_peg(pos, PLAYER1)
+
+    def add_black_peg(self, pos):
+        '''
+        Ajoute un pion au joueur noir à la position donnée.
+
+        Args:
+            pos (Pos2D): position à laquelle ajouter le pion
+        '''
+        self.__add_peg(pos, PLAYER2)
+
+    def __add_peg(self, pos, player):
+        '''
+        Ajoute un pion au joueur donné à la position donnée.
+
+        Args:
+            pos (Pos2D): position à laquelle ajouter le pion
+            player (int): joueur auquel ajouter le pion
+
+        Raises:
+            InvalidPositionError: s'il est impossible d'ajouter le pion
+        '''
+        owner = self.owner(pos)
+        if owner != EMPTY:
+            raise InvalidPositionError(f'Case {pos} déjà occupée par: {owner}')
+        idx = self.__index(pos)
+        self.bits_[player-1] |= 1 << idx
+        self.key_ ^= self.zobrist_[player-1][idx]
+        if self.evaluator_ is not None:
+            self.evaluator_.add_peg(idx, player)
+
+    def check_integrity(self):
+        '''
+        Vérifie si le plateau représenté est valide, i.e.
+        (i)  aucune case n'est occupée par deux joueurs simultanément
+        (ii) aucun pion n'est en dehors du plateau
+
+        Returns:
+            bool: True si le plateau est ok et False sinon
+        '''
+        white, black = self.bits_
+        return white & black == 0 and (white | black) & ~self.full_ == 0
+
+    def print(self, special_position=None, special_char='#'):
+        '''
+        Affiche le plateau de jeu avec possibilité de mettre une case en évidence.
+
+        Args:
+            special_position (Pos2D): position à mettre en évidence (None si aucune)
+            special_char (str): caractère de mise en évidence
+        '''
+        m = self.m_
+        n = self.n_
+        for i in range(m):
+            print(m - i, end=' ')  # indices croissant de bas en haut
+            for j in range(n):
+                pos = self.squares_[i*n + j]
+                end = ' ' if j < n - 1 else '\n'
+                print(
+                    special_char if pos == special_position \
+                                 else CHARS[self.owner(pos)],
+                    end=end
+                )
+        print(' ', ' '.join(ALPHABET[:n]))
+
+    @property
+    def last_move(self):
+        return self.history_[-1].move if self.history_ else None
+
+    def __targets(self, bits, player):
+        '''
+        Calcule simultanément, par décalages et masques, les cases d'arrivée de
+        tous les pions d'un masque dans chacune des trois directions.
+
+        Args:
+            bits (int): masque des pions à déplacer
+            player (int): PLAYER1 ou PLAYER2
+
+        Returns:
+            List[Tuple[int,int]]:
+                paires (masque des cases d'arrivée, décalage src - dest) dans l'ordre
+                de VALID_MOVES (diagonale gauche, tout droit, diagonale droite)
+        '''
+        n = self.n_
+        own = self.bits_[player-1]
+        empty = self.full_ & ~(own | self.bits_[2-player])
+        not_own = self.full_ & ~own
+        if player == PLAYER1:
+            return [
+                (((bits & self.not_first_col_) >> (n+1)) & not_own, n+1),
+                ((bits >> n) & empty, n),
+                (((bits & self.not_last_col_) >> (n-1)) & not_own, n-1),
+            ]
+        return [
+            (((bits & self.not_first_col_) << (n-1)) & not_own, 1-n),
+            ((bits << n) & empty, -n),
+            (((bits & self.not_last_col_) << (n+1)) & not_own, -n-1),
+        ]
+
+    def __moves_from_targets(self, targets, player):
+        '''
+        Convertit des masques de cases d'arrivée en mouvements.
+
+        Args:
+            targets (List[Tuple[int,int]]): sortie de __targets
+            player (int): PLAYER1 ou PLAYER2
+
+        Returns:
+            Iterator[Move]: générateur des mouvements correspondants
+        '''
+        squares = self.squares_
+        for dests, offset in targets:
+            while dests:
+                low = dests & -dests
+                dest = low.bit_length()-1
+                yield Move(squares[dest+offset], squares[dest], player)
+                dests ^= low
+
+    def possible_moves_from_source(self, src, player):
+        '''
+        Génère tous les mouvements possibles pour un pion donné d'un joueur donné.
+
+        Args:
+            src (Pos2D): position de départ
+            player (int): PLAYER1 ou PLAYER2
+
+        Returns:
+            Iterator[Move]:
+                générateur des mouvements valides d'un pion de `player`
+                placé en position `src`
+        '''
+        bit = (1 << self.__index(src)) & self.bits_[player-1]
+        return self.__moves_from_targets(self.__targets(bit, player), player)
+
+    def _possible_moves(self, player):
+        '''
+        Génère tous les mouvements possibles que peut faire un joueur.
+
+        Args:
+            player (int): PLAYER1 ou PLAYER2
+
+        Returns:
+            Iterator[Move]: générateur des mouvemens valides de `player`
+        '''
+        targets = self.__targets(self.bits_[player-1], player)
+        return self.__moves_from_targets(targets, player)
+
+    def possible_moves(self, player):
+        '''
+        Génère tous les mouvements possibles que peut faire un joueur.
+        Les trois directions sont calculées pour tous les pions à la fois puis
+        converties en mouvements.
+
+        Args:
+            player (int): PLAYER1 ou PLAYER2
+
+        Returns:
+            List[Move]: liste des mouvements valides de `player`.
+        '''
+        return list(self._possible_moves(player))
+
+    def is_valid_direction(self, move):
+        '''
+        Détermine si un mouvement est valide.
+
+        Args:
+            move (Move): mouvement à tester.
+
+        Returns:
+            bool:
+                True si le déplacement est valide pour le joueur en question
+                et False sinon
+        '''
+        delta = move.delta
+        player = move.player
+        return delta in VALID_MOVES[player-1] and \
+               ((delta.x == 0 and self.owner(move.dest) == EMPTY) \
+             or (delta.x != 0 and self.owner(move.dest) != player))
+
+    def can_move_from(self, pos):
+        '''
+        Détermine s'il y a un pion pouvant se déplacer en position donnée.
+
+        Args:
+            pos (Pos2D): position à vérifier
+
+        Returns:
+            bool: True s'il y a un pion ayant au moins un mouvement valide et False sinon
+        '''
+        player = self.owner(pos)
+        if player == EMPTY:
+            return False
+        bit = 1 << self.__index(pos)
+        return any(dests for dests, _ in self.__targets(bit, player))
+
+    @property
+    def winner(self):
+        last_move = self.last_move
+        if last_move is None:
+            return None
+        last_player = last_move.player
+        last_y = last_move.dest.y
+        return PLAYER1 if last_y == 0 and last_player == PLAYER1 \
+          else PLAYER2 if last_y == self.m_-1 and last_player == PLAYER2 \
+          else PLAYER1 if self.bits_[1] == 0 \
+          else PLAYER2 if self.bits_[0] == 0 \
+          else None
+
+    def move(self, move):
+        '''
+        Effectue le coup demandé sur le plateau.
+
+        Args:
+            move (Move): action à effectuer
+        '''
+        player = move.player
+        src_idx = move.src.row*self.n_ + move.src.col
+        dest_idx = move.dest.row*self.n_ + move.dest.col
+        src = 1 << src_idx
+        dest = 1 << dest_idx
+        keys = self.zobrist_[player-1]
+        self.key_ ^= keys[src_idx] ^ keys[dest_idx] ^ self.zobrist_side_
+        captured = self.bits_[2-player] & dest != 0
+        if captured:
+            self.bits_[2-player] ^= dest
+            self.key_ ^= self.zobrist_[2-player][dest_idx]
+        self.bits_[player-1] ^= src | dest
+        self.history_.append(HistoryEntry(move, captured))
+        if self.evaluator_ is not None:
+            self.evaluator_.move(src_idx, dest_idx, player)
+
+    def undo(self):
+        '''
+        Annule le dernier coup qui a été joué sur le plateau.
+
+        Raises:
+            EmptyHistoryError: si l'historique est vide
+        '''
+        try:
+            last_entry = self.history_.pop()
+        except IndexError:
+            raise EmptyHistoryError('Aucun coup à annuler')
+        last_move = last_entry.move
+        player = last_move.player
+        src_idx = last_move.src.row*self.n_ + last_move.src.col
+        dest_idx = last_move.dest.row*self.n_ + last_move.dest.col
+        src = 1 << src_idx
+        dest = 1 << dest_idx
+        keys = self.zobrist_[player-1]
+        self.key_ ^= keys[src_idx] ^ keys[dest_idx] ^ self.zobrist_side_
+        self.bits_[player-1] ^= src | dest
+        if last_entry.captured:
+            self.bits_[2-player] |= dest
+            self.key_ ^= self.zobrist_[2-player][dest_idx]
+        if self.evaluator_ is not None:
+            self.evaluator_.undo(src_idx, dest_idx, player, last_entry.captured)
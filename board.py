@@ -2,8 +2,10 @@ from const import *
 from errors import *
 from matrix import Matrix
 from move import *
+from movetables import move_table, source_table
 from pegslist import PegsList
 from pos2d import Pos2D
+from zobrist import zobrist_keys
 
 class HistoryEntry:
     '''
@@ -37,7 +39,11 @@ class Board:
     Attributes:
         matrix (Matrix): représentation matricielle du plateau de jeu
         pegs (List[PegsList]): liste des pions blancs et noirs
+        bits (List[int]): masques des pions blancs et noirs (bit i*n + j pour la
+                          case (i, j), comme BitBoard.bits)
         history (List[HistoryEntry]): historique des coups joués sur le plateau
+        key (int): clé de Zobrist de la position (pions et parité du nombre de coups)
+        evaluator (Evaluator): évaluation statique tenue à jour (None si aucune)
         last_move (HistoryEntry): dernier coup présent dans l'historique
         m (int): nombre de lignes du plateau
         n (int): nombre de colonnes du plateau
@@ -48,14 +54,46 @@ class Board:
         .
     '''
     def __init__(self, rows, cols):
-        self.matrix_ = Matrix(rows, cols, EMPTY)
+        self.matrix_ = Matrix(rows, cols, EMPTY, 'b')
+        # accès direct (non vérifié) aux cases, indexées par i*n + j
+        self.cells_ = self.matrix_.buffer
         self.white_pegs_ = PegsList()
         self.black_pegs_ = PegsList()
         self.pegs_ = [
             self.white_pegs_,
             self.black_pegs_
         ]
+        self.bits_ = [0, 0]
         self.history_ = []
+        self.__load_tables(rows, cols)
+        self.key_ = 0
+        self.evaluator_ = None
+
+    def __load_tables(self, rows, cols):
+        '''
+        Récupère les tables (partagées) d'un plateau de taille donnée.
+
+        Args:
+            rows (int): nombre de lignes du plateau
+            cols (int): nombre de colonnes du plateau
+        '''
+        self.zobrist_, self.zobrist_side_ = zobrist_keys(rows, cols)
+        # déplacements possibles depuis chaque case, pour chaque joueur
+        self.move_tables_ = (
+            move_table(rows, cols, PLAYER1),
+            move_table(rows, cols, PLAYER2)
+        )
+
+    def __getstate__(self):
+        # les tables partagées ne sont ni copiées ni sérialisées
+        state = self.__dict__.copy()
+        for name in ('zobrist_', 'zobrist_side_', 'move_tables_'):
+            del state[name]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.__load_tables(self.m, self.n)
 
     @property
     def m(self):
@@ -73,6 +111,43 @@ class Board:
     def pegs(self):
         return self.pegs_
 
+    @property
+    def bits(self):
+        return self.bits_
+
+    @property
+    def history(self):
+        return self.history_
+
+    @property
+    def key(self):
+        return self.key_
+
+    @property
+    def evaluator(self):
+        return self.evaluator_
+
+    def attach_evaluator(self, evaluator):
+        '''
+        Associe au plateau une évaluation statique, tenue à jour à chaque coup.
+
+        Args:
+            evaluator (Evaluator): évaluateur à associer (None pour le retirer)
+        '''
+        self.evaluator_ = evaluator
+        if evaluator is None:
+            return
+        evaluator.reset(self.m, self.n)
+        for player, pegs in ((PLAYER1, self.pegs[0]), (PLAYER2, self.pegs[1])):
+            for pos in pegs:
+                evaluator.add_peg(pos.row*self.n + pos.col, player)
+
+    def __hash__(self):
+        return self.key_
+
+    def __eq__(self, other):
+        return isinstance(other, Board) and self.key_ == other.key_ \
+           and self.cells_ == other.cells_
 
     def add_white_peg(self, pos):
         '''
@@ -109,6 +184,22 @@ class Board:
             )
         self.matrix_[pos] = player
         self.pegs_[player-1].add(pos)
+        self.key_ ^= self.zobrist_[player-1][pos.row*self.n + pos.col]
+        self.bits_[player-1] |= 1 << (pos.row*self.n + pos.col)
+        if self.evaluator_ is not None:
+            self.evaluator_.add_peg(pos.row*self.n + pos.col, player)
+
+    def owner(self, pos):
+        '''
+        Détermine à qui appartient la case donnée.
+
+        Args:
+            pos (Pos2D): position sur le plateau
+
+        Returns:
+            int: EMPTY, PLAYER1 ou PLAYER2
+        '''
+        return self.matrix_[pos]
 
     def check_integrity(self):
         '''
@@ -142,10 +233,11 @@ class Board:
         '''
         m = self.matrix_.m
         n = self.matrix_.n
+        squares = Pos2D.squares(m, n)
         for i in range(m):
             print(m - i, end=' ')  # indices croissant de bas en haut
             for j in range(n):
-                pos = Pos2D(i, j)
+                pos = squares[i*n + j]
                 end = ' ' if j < n - 1 else '\n'
                 print(
                     special_char if pos  == special_position \
@@ -171,10 +263,11 @@ class Board:
                 générateur des mouvements valides d'un pion de `player`
                 placé en position `src`
         '''
-        for delta in VALID_MOVES[player-1]:
-            dest = src + delta
-            move = Move(src, dest, player)
-            if self.matrix_.is_valid_pos(dest) and self.is_valid_direction(move):
+        # équivalent à is_valid_direction, les déplacements hors du plateau étant
+        # déjà exclus de la table
+        cells = self.cells_
+        for move, dest, diagonal in self.move_tables_[player-1][src]:
+            if (cells[dest] != player) if diagonal else (cells[dest] == EMPTY):
                 yield move
 
     def _possible_moves(self, player):
@@ -203,7 +296,14 @@ class Board:
         Returns:
             List[Move]: liste des mouvements valides de `player`.
         '''
-        return list(self._possible_moves(player))
+        # même parcours que _possible_moves, sans générateurs intermédiaires
+        table = self.move_tables_[player-1]
+        cells = self.cells_
+        return [
+            move for src in self.pegs_[player-1] \
+                 for move, dest, diagonal in table[src] \
+                 if ((cells[dest] != player) if diagonal else (cells[dest] == EMPTY))
+        ]
 
     def is_valid_direction(self, move):
         '''
@@ -217,11 +317,12 @@ class Board:
                 True si le déplacement est valide pour le joueur en question
                 et False sinon
         '''
-        delta = move.delta
         player = move.player
-        return delta in VALID_MOVES[player-1] and \
-               ((delta.x == 0 and self.matrix_[move.dest] == EMPTY) \
-             or (delta.x != 0 and self.matrix_[move.dest] != player))
+        cells = self.cells_
+        for candidate, dest, diagonal in self.move_tables_[player-1].get(move.src, ()):
+            if candidate.dest is move.dest:
+                return (cells[dest] != player) if diagonal else (cells[dest] == EMPTY)
+        return False
 
     def can_move_from(self, pos):
         '''
@@ -259,8 +360,8 @@ class Board:
         last_y = last_move.dest.y
         return PLAYER1 if last_y == 0 and last_player == PLAYER1 \
           else PLAYER2 if last_y == self.m-1 and last_player == PLAYER2 \
-          else PLAYER1 if len(self.pegs_[0]) == 0 \
-          else PLAYER2 if len(self.pegs_[1]) == 0 \
+          else PLAYER1 if len(self.pegs_[1]) == 0 \
+          else PLAYER2 if len(self.pegs_[0]) == 0 \
           else None
 
     def move(self, move):
@@ -272,16 +373,47 @@ class Board:
         '''
         player = move.player
         other_player = 3-player
-        entry = HistoryEntry(move, self.matrix_[move.dest] == other_player)
+        n = self.n
+        src_idx = move.src.row*n + move.src.col
+        dest_idx = move.dest.row*n + move.dest.col
+        cells = self.cells_
+        entry = HistoryEntry(move, cells[dest_idx] == other_player)
+        self.key_ ^= self.__move_key(entry)
         if entry.captured:
             # pas besoin de gérer le cas où move.dest n'existe pas dans
             # self.pegs_[2-player] puisque par construction nous savons que tout objet
             # de type Player (ou spécialisation) renvoie un coup valide
             self.pegs_[2-player].remove(move.dest)
-        self.matrix_[move.src] = EMPTY
-        self.matrix_[move.dest] = player
+            self.bits_[2-player] ^= 1 << dest_idx
+        cells[src_idx] = EMPTY
+        cells[dest_idx] = player
+        self.bits_[player-1] ^= (1 << src_idx) | (1 << dest_idx)
         self.pegs_[player-1].move(move)
         self.history_.append(entry)
+        if self.evaluator_ is not None:
+            self.evaluator_.move(src_idx, dest_idx, player)
+
+    def __move_key(self, entry):
+        '''
+        Calcule la modification de la clé de Zobrist induite par un coup.
+        Comme la clé est combinée par ou exclusif, la même valeur sert à jouer
+        et à annuler le coup.
+
+        Args:
+            entry (HistoryEntry): coup joué
+
+        Returns:
+            int: valeur à combiner à la clé par ou exclusif
+        '''
+        move = entry.move
+        n = self.n
+        src = move.src.row*n + move.src.col
+        dest = move.dest.row*n + move.dest.col
+        keys = self.zobrist_[move.player-1]
+        delta = keys[src] ^ keys[dest] ^ self.zobrist_side_
+        if entry.captured:
+            delta ^= self.zobrist_[2-move.player][dest]
+        return delta
 
     def undo(self):
         '''
@@ -294,15 +426,145 @@ class Board:
             last_entry = self.history_.pop()
         except IndexError:
             raise EmptyHistoryError('Aucun coup à annuler')
+        self.key_ ^= self.__move_key(last_entry)
         last_move = last_entry.move
         other_player = 3-last_move.player
-        self.matrix_[last_move.src] = last_move.player
+        n = self.n
+        src_idx = last_move.src.row*n + last_move.src.col
+        dest_idx = last_move.dest.row*n + last_move.dest.col
+        cells = self.cells_
+        cells[src_idx] = last_move.player
+        self.bits_[last_move.player-1] ^= (1 << src_idx) | (1 << dest_idx)
         self.pegs_[last_move.player-1].move(reversed(last_move))
         # si la dernière action a capturé un pion adversaire,
         # il faut penser à le restituer
         if last_entry.captured:
-            self.matrix_[last_move.dest] = other_player
-            self.pegs_[other_player-1].add(last_move.dest)
+            cells[dest_idx] = other_player
+            self.bits_[other_player-1] ^= 1 << dest_idx
+            self.pegs_[other_player-1].restore(last_move.dest)
         else:
-            self.matrix_[last_move.dest] = EMPTY
+            cells[dest_idx] = EMPTY
+        if self.evaluator_ is not None:
+            self.evaluator_.undo(src_idx, dest_idx, last_move.player, last_entry.captured)
+
+class TrackedBoard(Board):
+    '''
+    Plateau tenant à jour les coups légaux de chaque pion (variante de Board, à
+    choisir explicitement : Board lui-même n'en paie jamais le coût). Un coup ne
+    change que les coups des pions sur ses cases de départ et d'arrivée ou pouvant
+    les atteindre : move ne recalcule que ceux-ci, après avoir empilé leurs
+    anciennes valeurs, que undo remet en place telles quelles (sans recalcul).
+    possible_moves se contente alors de rassembler les coups des pions, dans
+    l'ordre des pions : il est le même que pour Board, y compris après des
+    move/undo. En contrepartie, chaque coup recalcule une quinzaine d'entrées :
+    avec CPython, c'est plus cher qu'une génération complète par les tables de
+    Board (perft deux fois plus lent, cf. benchmark.py), si bien que cette
+    variante n'est rentable que si les coups d'une même position sont demandés
+    plusieurs fois.
+
+    Args:
+        rows (int): nombre de lignes du plateau
+        cols (int): nombre de colonnes du plateau
+
+    Attributes:
+        legal (Tuple[Dict[Pos2D,Tuple[Move]]]): pour chaque joueur, coups légaux de
+                                                chacun de ses pions
+    '''
+    def __init__(self, rows, cols):
+        super().__init__(rows, cols)
+        self.legal_ = ({}, {})
+        # pour chaque coup de l'historique, anciennes valeurs des entrées recalculées
+        self.saved_ = []
+        self.__load_sources(rows, cols)
+
+    def __load_sources(self, rows, cols):
+        '''
+        Récupère les tables (partagées) des cases à recalculer autour d'une case.
+
+        Args:
+            rows (int): nombre de lignes du plateau
+            cols (int): nombre de colonnes du plateau
+        '''
+        self.sources_ = (
+            source_table(rows, cols, PLAYER1),
+            source_table(rows, cols, PLAYER2)
+        )
+
+    def __getstate__(self):
+        state = super().__getstate__()
+        del state['sources_']
+        return state
+
+    def __setstate__(self, state):
+        super().__setstate__(state)
+        self.__load_sources(self.m, self.n)
+
+    @property
+    def legal(self):
+        return self.legal_
 
+    def __refresh_around(self, *changed):
+        '''
+        Recalcule les coups légaux affectés par la modification de cases : ceux
+        des pions sur ces cases ou pouvant les atteindre.
+
+        Args:
+            changed (Tuple[int]): indices des cases modifiées
+
+        Returns:
+            List[Tuple[Dict,Pos2D,Tuple[Move]]]:
+                entrées modifiées et leurs anciennes valeurs (None si absentes),
+                dans l'ordre des modifications
+        '''
+        saved = []
+        cells = self.cells_
+        for player in (PLAYER1, PLAYER2):
+            sources = self.sources_[player-1]
+            table = self.move_tables_[player-1]
+            legal = self.legal_[player-1]
+            for changed_idx in changed:
+                for idx, src in sources[changed_idx]:
+                    saved.append((legal, src, legal.get(src)))
+                    if cells[idx] != player:
+                        legal.pop(src, None)
+                        continue
+                    legal[src] = tuple([
+                        move for move, dest, diagonal in table[src] \
+                             if ((cells[dest] != player) if diagonal \
+                                 else (cells[dest] == EMPTY))
+                    ])
+        return saved
+
+    def add_white_peg(self, pos):
+        super().add_white_peg(pos)
+        self.__refresh_around(pos.row*self.n + pos.col)
+
+    def add_black_peg(self, pos):
+        super().add_black_peg(pos)
+        self.__refresh_around(pos.row*self.n + pos.col)
+
+    def possible_moves_from_source(self, src, player):
+        moves = self.legal_[player-1].get(src)
+        if moves is None:  # pas de pion de `player` en src
+            return super().possible_moves_from_source(src, player)
+        return iter(moves)
+
+    def possible_moves(self, player):
+        legal = self.legal_[player-1]
+        return [move for src in self.pegs_[player-1] for move in legal[src]]
+
+    def move(self, move):
+        super().move(move)
+        n = self.n
+        self.saved_.append(self.__refresh_around(
+            move.src.row*n + move.src.col, move.dest.row*n + move.dest.col
+        ))
+
+    def undo(self):
+        super().undo()
+        # ordre inverse : une entrée modifiée plusieurs fois retrouve sa première valeur
+        for legal, src, moves in reversed(self.saved_.pop()):
+            if moves is None:
+                legal.pop(src, None)
+            else:
+                legal[src] = moves
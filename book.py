@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+'''
+Bibliothèque d'ouvertures : meilleurs coups des premières positions de la partie,
+calculés hors ligne et stockés dans un fichier binaire trié par clé de Zobrist.
+
+Usage : python book.py FICHIER [--plies 4] [--depth 4] [-w 4] [--board PLATEAU]
+
+Format du fichier (petit-boutiste) :
+- en-tête : signature BOOK_MAGIC, version, nombre de lignes et de colonnes du
+  plateau, nombre d'entrées ;
+- entrées triées par clé : clé de Zobrist (64 bits), indices i*n + j des cases
+  de départ et d'arrivée du coup (16 bits chacun), score du coup (flottant 32 bits,
+  du point de vue du joueur au trait).
+Le fichier est projeté en mémoire (mmap) et consulté par recherche dichotomique,
+sans lecture préalable.
+'''
+import argparse
+import mmap
+import struct
+from concurrent.futures import ProcessPoolExecutor
+
+from board import Board
+from breakthrough import Breakthrough
+from const import *
+from errors import BadFormatError
+from move import Move
+from players import MinimaxAiPlayer, RandomAiPlayer
+from pos2d import Pos2D
+
+BOOK_MAGIC = b'BTOB'
+BOOK_VERSION = 1
+HEADER = struct.Struct('<4sHHHxxI')
+ENTRY = struct.Struct('<QHHf')
+
+class OpeningBook:
+    '''
+    Bibliothèque d'ouvertures projetée en mémoire.
+
+    Args:
+        path (str): chemin du fichier
+
+    Attributes:
+        path (str): chemin du fichier
+        m (int): nombre de lignes du plateau
+        n (int): nombre de colonnes du plateau
+
+    Raises:
+        BadFormatError: si le fichier n'est pas une bibliothèque d'ouvertures
+    '''
+    def __init__(self, path):
+        self.path_ = path
+        with open(path, 'rb') as f:
+            try:
+                self.mmap_ = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:  # fichier vide : rien à projeter
+                raise BadFormatError(f'Bibliothèque d\'ouvertures vide : "{path}"') from None
+        if len(self.mmap_) < HEADER.size:
+            self.mmap_.close()
+            raise BadFormatError(f'Bibliothèque d\'ouvertures invalide : "{path}"')
+        magic, version, self.m_, self.n_, self.size_ = HEADER.unpack_from(self.mmap_)
+        if magic != BOOK_MAGIC or version != BOOK_VERSION \
+           or len(self.mmap_) != HEADER.size + self.size_*ENTRY.size:
+            self.mmap_.close()
+            raise BadFormatError(f'Bibliothèque d\'ouvertures invalide : "{path}"')
+
+    def __reduce__(self):
+        # la projection n'est pas transmissible : le fichier est rouvert
+        return (OpeningBook, (self.path_,))
+
+    @property
+    def path(self):
+        return self.path_
+
+    @property
+    def m(self):
+        return self.m_
+
+    @property
+    def n(self):
+        return self.n_
+
+    def __len__(self):
+        return self.size_
+
+    def close(self):
+        '''
+        Ferme la projection du fichier.
+        '''
+        self.mmap_.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def probe(self, key):
+        '''
+        Cherche une position par recherche dichotomique.
+
+        Args:
+            key (int): clé de Zobrist de la position
+
+        Returns:
+            Tuple[int,int,float]: indices des cases de départ et d'arrivée du coup
+                                  et son score (None si la position est absente)
+        '''
+        data = self.mmap_
+        lo, hi = 0, self.size_
+        while lo < hi:
+            mid = (lo+hi) // 2
+            mid_key, = struct.unpack_from('<Q', data, HEADER.size + mid*ENTRY.size)
+            if mid_key < key:
+                lo = mid+1
+            else:
+                hi = mid
+        if lo == self.size_:
+            return None
+        entry_key, src, dest, score = ENTRY.unpack_from(data, HEADER.size + lo*ENTRY.size)
+        return (src, dest, score) if entry_key == key else None
+
+    def move_for(self, board, player):
+        '''
+        Cherche le coup de la bibliothèque pour la position d'un plateau.
+
+        Args:
+            board (Board): plateau dans sa position actuelle
+            player (int): joueur au trait
+
+        Returns:
+            Move: coup à jouer (None si la position est absente ou si le coup
+                  trouvé n'est pas légal, en cas de collision de clés)
+        '''
+        if board.m != self.m_ or board.n != self.n_:
+            return None
+        entry = self.probe(board.key)
+        if entry is None:
+            return None
+        squares = Pos2D.squares(self.m_, self.n_)
+        src, dest, _ = entry
+        if src >= len(squares) or dest >= len(squares):
+            return None
+        move = Move(squares[src], squares[dest], player)
+        return move if move in board.possible_moves(player) else None
+
+def write_book(path, rows, cols, entries):
+    '''
+    Écrit une bibliothèque d'ouvertures.
+
+    Args:
+        path (str): chemin du fichier
+        rows (int): nombre de lignes du plateau
+        cols (int): nombre de colonnes du plateau
+        entries (Iterable[Tuple[int,int,int,float]]):
+            (clé, case de départ, case d'arrivée, score) ; une seule entrée par clé
+    '''
+    entries = sorted(entries)
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(BOOK_MAGIC, BOOK_VERSION, rows, cols, len(entries)))
+        for entry in entries:
+            f.write(ENTRY.pack(*entry))
+
+def _start_board(path, board_type, moves):
+    '''
+    Construit la position atteinte par une suite de coups depuis le plateau de départ.
+
+    Args:
+        path (str): chemin vers le plateau de départ (None pour le plateau par défaut)
+        board_type (type): représentation du plateau
+        moves (List[Move]): coups à jouer
+
+    Returns:
+        Board: plateau dans la position atteinte
+    '''
+    board = Breakthrough(
+        path, board_type=board_type, player_types=(RandomAiPlayer, RandomAiPlayer)
+    ).board
+    for move in moves:
+        board.move(move)
+    return board
+
+def _search_position(args):
+    '''
+    Cherche le meilleur coup d'une position (fonction exécutée dans le pool).
+
+    Args:
+        args (Tuple): (path, board_type, moves, player, depth)
+
+    Returns:
+        Tuple[Move,float]: meilleur coup et son score
+    '''
+    path, board_type, moves, player, depth = args
+    board = _start_board(path, board_type, moves)
+    searcher = MinimaxAiPlayer(player, board, depth=depth, time_budget=POS_INF)
+    return searcher.iterative_deepening(POS_INF, depth)
+
+def build_book(path=None, board_type=Board, plies=BOOK_PLIES, depth=BOOK_DEPTH,
+               workers=1):
+    '''
+    Calcule les entrées d'une bibliothèque d'ouvertures. Pour chaque couleur, on
+    parcourt les `plies` premiers coups en jouant le meilleur coup (recherche
+    alpha-beta à profondeur `depth`) pour cette couleur et toutes les réponses
+    possibles de l'adversaire : la bibliothèque couvre ainsi toute partie où le
+    joueur suit ses coups, quoi que fasse l'adversaire.
+
+    Args:
+        path (str): chemin vers le plateau de départ (None pour le plateau par défaut)
+        board_type (type): représentation du plateau
+        plies (int): nombre de coups couverts depuis le début de la partie
+        depth (int): profondeur des recherches
+        workers (int): nombre de processus
+
+    Returns:
+        Tuple[int,int,List[Tuple[int,int,int,float]]]:
+            taille du plateau (lignes, colonnes) et entrées de la bibliothèque
+    '''
+    game = Breakthrough(
+        path, board_type=board_type, player_types=(RandomAiPlayer, RandomAiPlayer)
+    )
+    start = game.board
+    first, second = game.first_player, (PLAYER1+PLAYER2)-game.first_player
+    n = start.n
+    results = {}  # clé -> (coup, score)
+    executor = ProcessPoolExecutor(workers) if workers > 1 else None
+    search = map if executor is None else executor.map
+    try:
+        for book_player in (PLAYER1, PLAYER2):
+            level = {start.key: []}  # clé -> suite de coups menant à la position
+            for ply in range(plies):
+                player = first if ply % 2 == 0 else second
+                if player == book_player:
+                    jobs = [
+                        (key, moves) for key, moves in level.items() if key not in results
+                    ]
+                    found = search(_search_position, [
+                        (path, board_type, moves, player, depth) for _, moves in jobs
+                    ])
+                    for (key, _), result in zip(jobs, found):
+                        results[key] = result
+                next_level = {}
+                for key, moves in level.items():
+                    board = _start_board(path, board_type, moves)
+                    if board.winner is not None:
+                        continue
+                    if player == book_player:
+                        children = [results[key][0]] if results[key][0] is not None else []
+                    else:
+                        children = board.possible_moves(player)
+                    for move in children:
+                        board.move(move)
+                        next_level.setdefault(board.key, moves + [move])
+                        board.undo()
+                level = next_level
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    entries = [
+        (key, move.src.row*n + move.src.col, move.dest.row*n + move.dest.col, score) \
+        for key, (move, score) in results.items() if move is not None
+    ]
+    return start.m, start.n, entries
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('output', help='fichier de la bibliothèque')
+    parser.add_argument('--plies', type=int, default=BOOK_PLIES)
+    parser.add_argument('--depth', type=int, default=BOOK_DEPTH)
+    parser.add_argument('-w', '--workers', type=int, default=1)
+    parser.add_argument('--board', default=None, help='fichier du plateau de départ')
+    args = parser.parse_args()
+    rows, cols, entries = build_book(
+        args.board, Board, args.plies, args.depth, args.workers
+    )
+    write_book(args.output, rows, cols, entries)
+    print(f'{len(entries)} positions écrites dans {args.output}')
+
+if __name__ == '__main__':
+    main()
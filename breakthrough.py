@@ -2,20 +2,37 @@ from board import Board
 from const import *
 from players import *
 from pos2d import Pos2D
+from records import GameRecord, GameWriter, board_from_fen
 
 
 class Breakthrough:
-    def __init__(self, path=None, player2_is_ai=False):
+    def __init__(self, path=None, player2_is_ai=False, board_type=Board,
+                 player_types=None):
         '''
+        Args:
+            path (str): chemin vers le plateau de jeu (None pour le plateau par défaut)
+            player2_is_ai (bool): True si le joueur 2 est une AI
+            board_type (type): représentation du plateau (Board ou BitBoard)
+            player_types (Tuple[type,type]): types (ou fabriques `f(player_id, board)`)
+                                             des deux joueurs ; remplace player2_is_ai
+
         Attributes:
             board (Board): le plateau de jeu
             players (List[Player]): liste contenant les deux joueurs.
+            first_player (int): joueur jouant le premier coup (PLAYER1, sauf
+                                position FEN avec les noirs au trait)
             winner (int): alias de board.winner
         '''
+        self.board_type_ = board_type
+        self.first_player_ = PLAYER1
         self.__init_from_file(path)
-        player2_type = MinimaxAiPlayer or MonteCarlo if player2_is_ai == '-ai' else HumanPlayer
-        player1 = HumanPlayer(PLAYER1, self.board_)
-        player2 = player2_type(PLAYER2, self.board_)
+        if player_types is None:
+            player_types = (
+                HumanPlayer,
+                MinimaxAiPlayer if player2_is_ai else HumanPlayer
+            )
+        player1 = player_types[0](PLAYER1, self.board_)
+        player2 = player_types[1](PLAYER2, self.board_)
         self.players_ = [
             player1,
             player2
@@ -35,7 +52,9 @@ class Breakthrough:
 
     def __make_board_from_file(self, path):
         '''
-        Construit le plateau de jeu depuis un fichier.
+        Construit le plateau de jeu depuis un fichier : soit une position au format
+        FEN sur une ligne (cf. records), qui donne aussi le joueur au trait, soit la
+        taille du plateau suivie des positions des pions de chaque joueur.
 
         Args:
             path (str): chemin vers le plateau de jeu
@@ -44,12 +63,18 @@ class Breakthrough:
             BadFormatError: si le fichier fourni est incorrect
         '''
         with open(path, 'r') as f:
-            rows, cols = map(int, f.readline().strip().split(' '))
-            self.board_ = Board(rows, cols)
-            for position in self.__find_positions_from_line(f.readline().strip()):
-                self.board_.add_white_peg(position)
-            for position in self.__find_positions_from_line(f.readline().strip()):
-                self.board_.add_black_peg(position)
+            first_line = f.readline().strip()
+            if '/' in first_line:
+                self.board_, self.first_player_ = board_from_fen(
+                    first_line, self.board_type_
+                )
+            else:
+                rows, cols = map(int, first_line.split(' '))
+                self.board_ = self.board_type_(rows, cols)
+                for position in self.__find_positions_from_line(f.readline().strip()):
+                    self.board_.add_white_peg(position)
+                for position in self.__find_positions_from_line(f.readline().strip()):
+                    self.board_.add_black_peg(position)
         if not self.board_.check_integrity():
             raise BadFormatError(f'Erreur dans le format du fichier "{path}"')
 
@@ -75,23 +100,50 @@ class Breakthrough:
         Construit un plateau carré n x n par défaut où chaque joueur a 2n pions répartis
         sur 2 lignes (n = DEFAULT_SIZE).
         '''
-        self.board_ = Board(DEFAULT_SIZE, DEFAULT_SIZE)
+        self.board_ = self.board_type_(DEFAULT_SIZE, DEFAULT_SIZE)
         for i in range(2):
             for j in range(DEFAULT_SIZE):
                 self.board_.add_white_peg(Pos2D(DEFAULT_SIZE-1-i, j))
                 self.board_.add_black_peg(Pos2D(i, j))
 
-    def play(self):
+    def play(self, verbose=True):
         '''
         Joue la partie sur le plateau stocké en attribut.
+
+        Args:
+            verbose (bool): False pour ne pas afficher le plateau après chaque coup
         '''
-        self.board_.print()
-        current = 1
+        if verbose:
+            self.board_.print()
+        current = self.first_player_-1
         while self.winner is None:
-            current = 1-current
             self.players_[current].play()
-            self.board_.print()
-            print('')
+            if verbose:
+                self.board_.print()
+                print('')
+            current = 1-current
+
+    def save(self, path):
+        '''
+        Ajoute la partie jouée au fichier de parties (cf. records).
+
+        Args:
+            path (str): chemin du fichier de parties
+        '''
+        with GameWriter(path, append=True) as writer:
+            writer.write(GameRecord.from_board(self.board_, first_player=self.first_player_))
+
+    @property
+    def board(self):
+        return self.board_
+
+    @property
+    def players(self):
+        return self.players_
+
+    @property
+    def first_player(self):
+        return self.first_player_
 
     @property
     def winner(self):
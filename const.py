@@ -32,6 +32,8 @@ NEG_INF = -INF
 DRAW = 0
 WIN  = +100
 LOSS = -100
+# borne des évaluations statiques (toujours dominées par une victoire)
+EVAL_BOUND = WIN//2 - 1
 
 # Input utilisateur
 YES   = 'y'
@@ -42,6 +44,43 @@ DOWN  = 'k'
 
 ALLOWED_TIME_IN_S = 4
 
+# Monte-Carlo : constante d'exploration de UCB1 et parallélisation
+UCT_C = 1.4
+ROOT_PARALLEL = 'root'
+LEAF_PARALLEL = 'leaf'
+LEAF_BATCH = 8
+# poids des coups dans les simulations (cf. playout.HeavyPolicy), les autres coups
+# ayant un poids de 1
+PLAYOUT_SAFE_CAPTURE = 8
+PLAYOUT_CAPTURE = 3
+PLAYOUT_SAFE_MOVE = 2
+# RAVE : paramètre d'équivalence k du mélange des statistiques AMAF (cf. UctSearch),
+# 0 pour le désactiver (aucune statistique AMAF n'est alors tenue). À 0,3 s par
+# coup, RAVE (k = 500, C = 0.4) perd face à UCT seul avec la même constante C :
+# il n'est donc pas activé par défaut
+RAVE_K = 0
+
+# Hachage de Zobrist et table de transposition
+ZOBRIST_SEED = 0x6272656b
+TT_SIZE = 1 << 18
+EXACT       = 0
+LOWER_BOUND = 1
+UPPER_BOUND = 2
+# nombre de coups killers conservés par profondeur (cf. ordering)
+KILLER_SLOTS = 2
+
+# Bibliothèque d'ouvertures : nombre de coups couverts et profondeur des recherches
+BOOK_PLIES = 4
+BOOK_DEPTH = 4
+
+# Tables de finales : nombre maximal de pions par joueur
+TABLEBASE_PEGS = 2
+
+# Génération de parties : nombre de parties par fichier et de coups aléatoires
+# en début de partie (pour diversifier les positions)
+SELFPLAY_SHARD_GAMES = 256
+SELFPLAY_RANDOM_PLIES = 2
+
 starting_fen = 'pppppppp/8/8/8/8/PPPPPPPP - 0 1'
 
 # Regular expressions for common chess notation
@@ -13,3 +13,7 @@ class EmptyHistoryError(BreakthroughError):
 class BadFormatError(BreakthroughError):
     def __init__(self, msg):
         super().__init__(msg)
+
+class SearchTimeoutError(BreakthroughError):
+    def __init__(self, msg):
+        super().__init__(msg)
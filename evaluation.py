@@ -0,0 +1,203 @@
+from const import *
+from movetables import attack_table
+
+class Evaluator:
+    '''
+    Évaluation statique d'une position, tenue à jour de manière incrémentale.
+
+    Le score est une somme de termes entiers par pion (positifs pour PLAYER1,
+    négatifs pour PLAYER2), divisée par UNIT. Les termes étant entiers, une même
+    position a toujours exactement le même score, quel que soit l'ordre des coups
+    qui y mènent. Le terme d'un pion ne dépend que des cases voisines et de sa
+    colonne :
+    - matériel : MATERIAL ;
+    - avancement : ADVANCE * (lignes parcourues / lignes à parcourir)^2 ;
+    - pion menacé par un pion adverse : -THREATENED ;
+    - pion défendu par un pion allié (reprise possible) : +DEFENDED ;
+    - colonne ouverte (aucun pion adverse entre le pion et la ligne d'arrivée) :
+      +OPEN_FILE.
+    Un coup ne modifie donc que les termes des pions proches de ses cases de départ
+    et d'arrivée ou dans leurs colonnes : seuls ces termes sont recalculés.
+
+    Le plateau informe l'évaluateur de chaque ajout de pion, coup et annulation
+    (Board.attach_evaluator). Pour changer la fonction d'évaluation, il suffit de
+    modifier les poids ou de redéfinir peg_score dans une classe dérivée.
+
+    Attributes:
+        score (float): évaluation du point de vue de PLAYER1, bornée par EVAL_BOUND
+    '''
+    UNIT       = 20
+    MATERIAL   = 20
+    ADVANCE    = 20
+    THREATENED = 10
+    DEFENDED   = 6
+    OPEN_FILE  = 10
+
+    def __init__(self):
+        self.reset(0, 0)
+
+    def reset(self, rows, cols):
+        '''
+        Vide l'évaluateur pour un plateau vide de taille donnée.
+
+        Args:
+            rows (int): nombre de lignes du plateau
+            cols (int): nombre de colonnes du plateau
+        '''
+        self.m_ = rows
+        self.n_ = cols
+        self.cells_ = bytearray(rows*cols)
+        # cols_[player-1][j] : masque des lignes occupées par `player` en colonne j
+        self.cols_ = [[0]*cols, [0]*cols]
+        self.score_ = 0
+        self.scores_ = []
+        last = max(rows-1, 1)
+        self.advance_ = [
+            [round(self.ADVANCE * ((rows-1-i)/last)**2) for i in range(rows)],
+            [round(self.ADVANCE * (i/last)**2) for i in range(rows)],
+        ]
+        self.affected_ = [self.__affected(idx) for idx in range(rows*cols)]
+        self.attacks_ = (attack_table(rows, cols, PLAYER1), attack_table(rows, cols, PLAYER2))
+
+    def __affected(self, idx):
+        '''
+        Cases dont le terme peut changer quand la case `idx` change.
+
+        Args:
+            idx (int): indice i*n + j de la case
+
+        Returns:
+            FrozenSet[int]: voisinage 3x3 de la case et sa colonne
+        '''
+        i, j = divmod(idx, self.n_)
+        squares = {k*self.n_ + j for k in range(self.m_)}
+        for di in (-1, 0, 1):
+            for dj in (-1, 0, 1):
+                if 0 <= i+di < self.m_ and 0 <= j+dj < self.n_:
+                    squares.add((i+di)*self.n_ + j+dj)
+        return frozenset(squares)
+
+    @property
+    def score(self):
+        return max(-EVAL_BOUND, min(EVAL_BOUND, self.score_/self.UNIT))
+
+    def score_for(self, player):
+        '''
+        Évaluation du point de vue d'un joueur donné.
+
+        Args:
+            player (int): PLAYER1 ou PLAYER2
+
+        Returns:
+            float: score, positif si la position est favorable à `player`
+        '''
+        return self.score if player == PLAYER1 else -self.score
+
+    def peg_score(self, idx):
+        '''
+        Terme d'évaluation du pion en case `idx`.
+
+        Args:
+            idx (int): indice i*n + j de la case
+
+        Returns:
+            int: terme du pion (positif pour PLAYER1, négatif pour PLAYER2),
+                 0 si la case est vide
+        '''
+        player = self.cells_[idx]
+        if player == EMPTY:
+            return 0
+        cells = self.cells_
+        i, j = divmod(idx, self.n_)
+        enemy = (PLAYER1+PLAYER2)-player
+        score = self.MATERIAL + self.advance_[player-1][i]
+        # menaces : pions adverses sur les diagonales avant
+        if any(cells[k] == enemy for k in self.attacks_[player-1][idx]):
+            score -= self.THREATENED
+        # défense : pions alliés sur les diagonales arrière, c'est-à-dire les cases
+        # qu'attaquerait un pion adverse placé ici
+        if any(cells[k] == player for k in self.attacks_[enemy-1][idx]):
+            score += self.DEFENDED
+        # colonne ouverte jusqu'à la ligne d'arrivée
+        ahead = (1 << i)-1 if player == PLAYER1 else ~((2 << i)-1)
+        if self.cols_[enemy-1][j] & ahead == 0:
+            score += self.OPEN_FILE
+        return score if player == PLAYER1 else -score
+
+    def evaluate(self):
+        '''
+        Recalcule entièrement l'évaluation (sans division par UNIT ni borne).
+
+        Returns:
+            int: somme des termes de tous les pions
+        '''
+        return sum(map(self.peg_score, range(self.m_*self.n_)))
+
+    def __set(self, idx, player):
+        '''
+        Modifie le contenu d'une case.
+
+        Args:
+            idx (int): indice i*n + j de la case
+            player (int): EMPTY, PLAYER1 ou PLAYER2
+        '''
+        i, j = divmod(idx, self.n_)
+        previous = self.cells_[idx]
+        if previous != EMPTY:
+            self.cols_[previous-1][j] &= ~(1 << i)
+        if player != EMPTY:
+            self.cols_[player-1][j] |= 1 << i
+        self.cells_[idx] = player
+
+    def __update(self, changes):
+        '''
+        Applique des modifications de cases en ne recalculant que les termes
+        affectés.
+
+        Args:
+            changes (List[Tuple[int,int]]): paires (indice de case, nouveau contenu)
+        '''
+        affected = set()
+        for idx, _ in changes:
+            affected |= self.affected_[idx]
+        before = sum(map(self.peg_score, affected))
+        for idx, player in changes:
+            self.__set(idx, player)
+        self.score_ += sum(map(self.peg_score, affected)) - before
+
+    def add_peg(self, idx, player):
+        '''
+        Signale l'ajout d'un pion.
+
+        Args:
+            idx (int): indice i*n + j de la case
+            player (int): PLAYER1 ou PLAYER2
+        '''
+        self.__update([(idx, player)])
+
+    def move(self, src, dest, player):
+        '''
+        Signale un coup joué (une éventuelle capture est déduite de la case d'arrivée).
+
+        Args:
+            src (int): indice de la case de départ
+            dest (int): indice de la case d'arrivée
+            player (int): joueur effectuant le coup
+        '''
+        self.scores_.append(self.score_)
+        self.__update([(src, EMPTY), (dest, player)])
+
+    def undo(self, src, dest, player, captured):
+        '''
+        Signale l'annulation du dernier coup. Le score précédent est restauré
+        sans recalcul.
+
+        Args:
+            src (int): indice de la case de départ du coup annulé
+            dest (int): indice de la case d'arrivée du coup annulé
+            player (int): joueur ayant effectué le coup
+            captured (bool): True si le coup avait capturé un pion
+        '''
+        self.__set(src, player)
+        self.__set(dest, (PLAYER1+PLAYER2)-player if captured else EMPTY)
+        self.score_ = self.scores_.pop()
@@ -1,27 +1,32 @@
+from array import array
+
 from pos2d import Pos2D
 
 class Matrix:
     '''
-    Matrice numérique de taille m x n.
+    Matrice numérique de taille m x n, stockée ligne par ligne dans un tableau
+    plat : l'entrée (i, j) est à l'indice i*n + j.
 
     Args:
         m (int): nombre de lignes
         n (int): nombre de colonnes
         init (int/float): valeur par défaut des entrées de la matrice
+        typecode (str): type des entrées (cf. module array), par exemple 'b' pour
+                        des entiers entre -128 et 127
 
     Attributes:
         m (int): nombre de lignes
         n (int): nombre de colonnes
         shape (tuple): (m, n)
         size (int): nombre d'éléments dans la matrice
+        buffer (array): entrées de la matrice, indexées par i*n + j ; l'accès par
+                        ce tableau n'est pas vérifié et est réservé aux boucles
+                        critiques (Board)
     '''
-    def __init__(self, m, n, init=0.):
+    def __init__(self, m, n, init=0., typecode='d'):
         self.m_ = m
         self.n_ = n
-        self.buffer_ = [
-            [init for x in range(n)] \
-            for y in range(m)
-        ]
+        self.buffer_ = array(typecode, [init]) * (m*n)
 
     @property
     def m(self):
@@ -39,6 +44,37 @@ class Matrix:
     def size(self):
         return self.m * self.n
 
+    @property
+    def buffer(self):
+        return self.buffer_
+
+    def copy(self):
+        '''
+        Copie la matrice (une seule copie du tableau plat).
+
+        Returns:
+            Matrix: nouvelle matrice de mêmes entrées
+        '''
+        other = Matrix.__new__(Matrix)
+        other.m_ = self.m_
+        other.n_ = self.n_
+        other.buffer_ = self.buffer_[:]
+        return other
+
+    def __copy__(self):
+        return self.copy()
+
+    def __deepcopy__(self, memo):
+        # le tableau peut être partagé (cf. Board.cells_) : la copie doit l'être aussi
+        other = self.copy()
+        buffer = memo.get(id(self.buffer_))
+        if buffer is not None:
+            other.buffer_ = buffer
+        else:
+            memo[id(self.buffer_)] = other.buffer_
+        memo[id(self)] = other
+        return other
+
     def is_valid_pos(self, pos):
         '''
         Vérifie si une position donnée correspond à un indiçage valide de la matrice.
@@ -89,7 +125,7 @@ class Matrix:
             IndexError: si pos n'est pas une position valide
         '''
         pos = self.__check_pos(pos)
-        return self.buffer_[pos.y][pos.x]
+        return self.buffer_[pos.y*self.n_ + pos.x]
 
     def __setitem__(self, pos, value):
         '''
@@ -103,7 +139,7 @@ class Matrix:
             IndexError: si pos n'est as une position valide
         '''
         pos = self.__check_pos(pos)
-        self.buffer_[pos.y][pos.x] = value
+        self.buffer_[pos.y*self.n_ + pos.x] = value
 
     def count(self, value):
         '''
@@ -115,4 +151,4 @@ class Matrix:
         Returns:
             int: nombre d'occurrences de `value` dans la matrice.
         '''
-        return sum(row.count(value) for row in self.buffer_)
+        return self.buffer_.count(value)
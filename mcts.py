@@ -0,0 +1,567 @@
+import copy
+import time
+from math import log, sqrt
+from random import getrandbits, shuffle
+from random import seed as random_seed
+
+from const import *
+from oracle import oracle
+from playout import HeavyPolicy
+from transposition import TranspositionTable
+
+class UctNode:
+    '''
+    Noeud de l'arbre de recherche UCT. Un noeud correspond à une position : deux
+    suites de coups menant à la même position (transposition) partagent le même
+    noeud et donc les mêmes statistiques.
+
+    Args:
+        player (int): joueur ayant joué le coup menant à cette position
+
+    Attributes:
+        player (int): joueur ayant joué le coup menant à cette position
+        moves (List[Move]): coups déjà développés depuis cette position
+        children (List[UctNode]): noeuds atteints par ces coups (même ordre)
+        untried (List[Move]): coups pas encore développés
+                              (None tant que la position n'a pas été développée)
+        plays (int): nombre de simulations passées par ce noeud
+        wins (int): nombre de ces simulations gagnées par `player`
+        amaf (Dict[Move,List[int]]): pour chaque coup possible (développé ou non),
+                                     nombre de simulations passées par ce noeud où
+                                     le joueur au trait l'a joué ensuite et nombre
+                                     de ces simulations qu'il a gagnées
+                                     (statistiques AMAF, None sans RAVE)
+    '''
+    __slots__ = ('player', 'moves', 'children', 'untried', 'plays', 'wins', 'amaf')
+
+    def __init__(self, player):
+        self.player = player
+        self.moves = []
+        self.children = []
+        self.untried = None
+        self.plays = 0
+        self.wins = 0
+        self.amaf = None
+
+    def child(self, move):
+        '''
+        Cherche l'enfant atteint par un coup donné.
+
+        Args:
+            move (Move): coup joué depuis cette position
+
+        Returns:
+            UctNode: noeud correspondant ou None s'il n'a pas été développé
+        '''
+        for i, child_move in enumerate(self.moves):
+            if child_move == move:
+                return self.children[i]
+        return None
+
+class UctSearch:
+    '''
+    Recherche arborescente Monte-Carlo (UCT) : sélection, expansion, simulation
+    puis rétropropagation, répétées jusqu'à épuisement du temps alloué.
+
+    Avec RAVE (rave > 0), chaque noeud tient aussi, pour chacun de ses coups
+    possibles, des statistiques AMAF (all moves as first) : toute simulation où le
+    coup est joué plus tard par le même joueur compte comme si elle l'avait joué
+    tout de suite. Ces statistiques convergent bien plus vite mais sont biaisées ;
+    la sélection utilise (1-β)*UCT + β*AMAF avec β = sqrt(k / (3n + k)), où n est
+    le nombre de simulations du coup et k = rave : l'AMAF domine tant que n est
+    petit devant k. Les coups non développés sont mis en concurrence avec les
+    autres d'après leur seule estimation AMAF, au lieu d'être tous développés
+    avant de sélectionner : l'arbre s'approfondit ainsi plus vite le long des
+    coups prometteurs. En parallélisation aux feuilles, seuls les coups de l'arbre
+    alimentent l'AMAF.
+
+    L'arbre est conservé d'une recherche à l'autre : au début de chaque recherche,
+    la racine descend le long des coups joués depuis (le coup choisi puis la réponse
+    adverse), si bien que les simulations déjà faites dans ce sous-arbre sont
+    réutilisées.
+
+    Args:
+        player_id (int): joueur pour lequel on cherche un coup
+        exploration (float): constante d'exploration C de UCB1
+        table_size (int): nombre de cases de la table des positions
+        policy (RandomPolicy): politique de simulation (HeavyPolicy() par défaut)
+        rave (float): paramètre d'équivalence k de RAVE (0 pour UCT seul)
+
+    Attributes:
+        exploration (float): constante d'exploration C de UCB1
+        policy (RandomPolicy): politique de simulation
+        rave (float): paramètre d'équivalence k de RAVE (0 pour UCT seul)
+        root (UctNode): racine de l'arbre (position courante)
+        simulations (int): nombre de simulations de la dernière recherche
+        table (TranspositionTable): noeuds de l'arbre indexés par position
+    '''
+    def __init__(self, player_id, exploration=UCT_C, table_size=TT_SIZE, policy=None,
+                 rave=RAVE_K):
+        self.player_id_ = player_id
+        self.exploration_ = exploration
+        self.policy_ = HeavyPolicy() if policy is None else policy
+        self.rave_ = rave
+        self.table_ = TranspositionTable(table_size)
+        self.root_ = None
+        self.root_ply_ = 0
+        self.root_entry_ = None
+        self.simulations_ = 0
+
+    @property
+    def exploration(self):
+        return self.exploration_
+
+    @exploration.setter
+    def exploration(self, value):
+        self.exploration_ = value
+
+    @property
+    def policy(self):
+        return self.policy_
+
+    @policy.setter
+    def policy(self, policy):
+        self.policy_ = policy
+
+    @property
+    def rave(self):
+        return self.rave_
+
+    @rave.setter
+    def rave(self, value):
+        self.rave_ = value
+
+    @property
+    def root(self):
+        return self.root_
+
+    @property
+    def simulations(self):
+        return self.simulations_
+
+    @property
+    def table(self):
+        return self.table_
+
+    def tree_depth(self):
+        '''
+        Calcule la profondeur de l'arbre sous la racine (parcours complet : à
+        réserver aux statistiques).
+
+        Returns:
+            int: nombre maximal de coups entre la racine et un noeud de l'arbre
+        '''
+        if self.root_ is None:
+            return 0
+        # parcours en largeur : les transpositions ne sont visitées qu'une fois
+        seen = {id(self.root_)}
+        frontier = [self.root_]
+        depth = -1
+        while frontier:
+            depth += 1
+            next_frontier = []
+            for node in frontier:
+                for child in node.children:
+                    if id(child) not in seen:
+                        seen.add(id(child))
+                        next_frontier.append(child)
+            frontier = next_frontier
+        return depth
+
+    def sync(self, board):
+        '''
+        Place la racine de l'arbre sur la position actuelle du plateau, en
+        réutilisant le sous-arbre des coups joués depuis la dernière recherche.
+
+        Args:
+            board (Board): plateau dans sa position actuelle
+        '''
+        history = board.history
+        node = self.root_
+        if node is not None and len(history) >= self.root_ply_ and \
+           (self.root_ply_ == 0 or history[self.root_ply_-1] is self.root_entry_):
+            for entry in history[self.root_ply_:]:
+                node = node.child(entry.move)
+                if node is None:
+                    break
+        else:
+            node = None
+        if node is None:
+            self.table_.clear()
+            last_move = board.last_move
+            node = UctNode(
+                last_move.player if last_move is not None \
+                                 else (PLAYER1+PLAYER2)-self.player_id_
+            )
+        self.root_ = node
+        self.root_ply_ = len(history)
+        self.root_entry_ = history[-1] if history else None
+        self.table_.new_search()
+
+    def run(self, board, time_budget):
+        '''
+        Lance des simulations depuis la position actuelle pendant le temps donné.
+
+        Args:
+            board (Board): plateau dans sa position actuelle (laissé inchangé)
+            time_budget (float): temps alloué en secondes
+        '''
+        self.sync(board)
+        self.simulations_ = 0
+        deadline = time.time() + time_budget
+        while time.time() < deadline:
+            self.iterate(board)
+            self.simulations_ += 1
+
+    def iterate(self, board):
+        '''
+        Effectue une simulation complète : sélection, expansion, simulation et
+        rétropropagation. Le plateau est remis dans son état de départ.
+
+        Args:
+            board (Board): plateau dans la position de la racine
+        '''
+        path, plies = self.descend(board)
+        winner, rollout_plies = self.rollout(board, (PLAYER1+PLAYER2)-path[-1].player)
+        if self.rave_:
+            history = board.history
+            self.update_amaf(
+                path, [entry.move for entry in history[len(history)-plies-rollout_plies:]],
+                (winner == PLAYER1, winner == PLAYER2)
+            )
+        for _ in range(plies + rollout_plies):
+            board.undo()
+        for node in path:
+            node.plays += 1
+            if node.player == winner:
+                node.wins += 1
+
+    @staticmethod
+    def update_amaf(path, moves, wins, plays=1):
+        '''
+        Met à jour les statistiques AMAF des noeuds d'un chemin : pour chaque
+        noeud, les coups joués depuis ce noeud jusqu'à la fin de la simulation
+        comptent comme s'ils avaient été joués depuis ce noeud (une seule fois par
+        simulation).
+
+        Args:
+            path (List[UctNode]): chemin depuis la racine
+            moves (List[Move]): coups de la simulation, depuis la racine (moves[k]
+                                est joué depuis path[k])
+            wins (Tuple[int,int]): nombre de simulations gagnées par PLAYER1 et PLAYER2
+            plays (int): nombre de simulations
+        '''
+        later = set()
+        tail = len(moves)
+        for k in range(len(path)-1, -1, -1):
+            while tail > k:
+                tail -= 1
+                later.add(moves[tail])
+            amaf = path[k].amaf
+            if not amaf:
+                continue
+            # le joueur fait partie du coup : seuls ceux du joueur au trait comptent
+            for move, stats in amaf.items():
+                if move in later:
+                    stats[0] += plays
+                    stats[1] += wins[move.player-1]
+
+    def descend(self, board):
+        '''
+        Sélectionne une feuille selon UCB1 et la développe d'un coup. Les coups
+        sont joués sur le plateau, qui est laissé dans la position de la feuille.
+
+        Args:
+            board (Board): plateau dans la position de la racine
+
+        Returns:
+            Tuple[List[UctNode],int]: chemin depuis la racine et nombre de coups joués
+        '''
+        node = self.root_
+        path = [node]
+        plies = 0
+        untried_idx = -1
+        # sélection : on descend tant que tous les coups du noeud sont développés
+        # (avec RAVE, tant qu'un enfant est préféré aux coups non développés)
+        while node.untried is not None and node.children:
+            if node.untried and not node.amaf:
+                break
+            idx = self.select(node)
+            if idx >= len(node.children):
+                untried_idx = idx - len(node.children)
+                break
+            board.move(node.moves[idx])
+            plies += 1
+            node = node.children[idx]
+            path.append(node)
+        # expansion
+        if board.winner is None:
+            to_move = (PLAYER1+PLAYER2)-node.player
+            if node.untried is None:
+                node.untried = board.possible_moves(to_move)
+                shuffle(node.untried)
+                if self.rave_:
+                    node.amaf = {move: [0, 0] for move in node.untried}
+            if node.untried:
+                move = node.untried.pop(untried_idx)
+                board.move(move)
+                plies += 1
+                path.append(self.expand(node, move, board))
+        return path, plies
+
+    def run_leaf_parallel(self, board, time_budget, executor, workers, batch):
+        '''
+        Parallélisation aux feuilles : à chaque tour, `workers` feuilles sont
+        sélectionnées (une perte virtuelle écarte les suivantes des feuilles déjà
+        choisies) et chacune est simulée `batch` fois par un processus du pool.
+
+        Args:
+            board (Board): plateau dans sa position actuelle (laissé inchangé)
+            time_budget (float): temps alloué en secondes
+            executor (concurrent.futures.Executor): pool de processus
+            workers (int): nombre de feuilles simulées en parallèle
+            batch (int): nombre de simulations par feuille
+        '''
+        self.sync(board)
+        self.simulations_ = 0
+        deadline = time.time() + time_budget
+        while time.time() < deadline:
+            jobs = []
+            for _ in range(workers):
+                path, plies = self.descend(board)
+                for node in path:  # perte virtuelle
+                    node.plays += 1
+                history = board.history
+                moves = [entry.move for entry in history[len(history)-plies:]]
+                jobs.append((path, moves, executor.submit(
+                    leaf_rollouts, copy.deepcopy(board),
+                    (PLAYER1+PLAYER2)-path[-1].player, batch, getrandbits(32),
+                    self.policy_
+                )))
+                for _ in range(plies):
+                    board.undo()
+            for path, moves, future in jobs:
+                wins = future.result()
+                for node in path:
+                    node.plays += batch-1
+                    node.wins += wins[node.player-1]
+                if self.rave_:
+                    self.update_amaf(path, moves, wins, batch)
+                self.simulations_ += batch
+
+    def expand(self, parent, move, board):
+        '''
+        Ajoute à un noeud l'enfant atteint par un coup (déjà joué sur le plateau).
+        Si la position atteinte est déjà dans l'arbre, son noeud est réutilisé.
+
+        Args:
+            parent (UctNode): noeud de départ
+            move (Move): coup développé
+            board (Board): plateau après `move`
+
+        Returns:
+            UctNode: noeud de la position atteinte
+        '''
+        child = self.table_.probe(board.key)
+        if child is None:
+            child = UctNode(move.player)
+            self.table_.store(board.key, child)
+        parent.moves.append(move)
+        parent.children.append(child)
+        return child
+
+    def select(self, node):
+        '''
+        Choisit l'enfant à explorer selon UCB1. Avec RAVE, la proportion de
+        victoires est mélangée à celle des statistiques AMAF, et les coups non
+        développés concourent d'après leur seule estimation AMAF (comptée avec une
+        victoire sur deux simulations fictives, et explorée comme un coup simulé
+        une fois).
+
+        Args:
+            node (UctNode): noeud entièrement développé (ou tenant des statistiques
+                            AMAF)
+
+        Returns:
+            int: indice de l'enfant choisi, ou len(node.children) + i pour le coup
+                 non développé node.untried[i]
+        '''
+        log_plays = log(node.plays)
+        c = self.exploration_
+        k = self.rave_
+        amaf = node.amaf if k else None
+        best_idx = 0
+        best_value = NEG_INF
+        for i, child in enumerate(node.children):
+            plays = child.plays
+            if plays == 0:
+                return i
+            value = child.wins/plays
+            if amaf:
+                amaf_plays, amaf_wins = amaf[node.moves[i]]
+                if amaf_plays:
+                    beta = sqrt(k/(3*plays + k))
+                    value += beta*(amaf_wins/amaf_plays - value)
+            value += c*sqrt(log_plays/plays)
+            if value > best_value:
+                best_idx, best_value = i, value
+        if amaf and node.untried:
+            offset = len(node.children)
+            exploration = c*sqrt(log_plays)
+            for i, move in enumerate(node.untried):
+                amaf_plays, amaf_wins = amaf[move]
+                value = (amaf_wins+1)/(amaf_plays+2) + exploration
+                if value > best_value:
+                    best_idx, best_value = offset+i, value
+        return best_idx
+
+    def rollout(self, board, player):
+        '''
+        Termine la partie sur le plateau (sans l'annuler) selon la politique de
+        simulation (cf. simulate).
+
+        Args:
+            board (Board): plateau de départ
+            player (int): joueur devant jouer
+
+        Returns:
+            Tuple[int,int]: vainqueur et nombre de coups joués
+        '''
+        return simulate(board, player, self.policy_)
+
+    def root_stats(self):
+        '''
+        Statistiques des coups de la racine.
+
+        Returns:
+            List[Tuple[Move,int,int]]: (coup, simulations, victoires) de chaque enfant
+        '''
+        root = self.root_
+        return [
+            (move, child.plays, child.wins) \
+            for move, child in zip(root.moves, root.children)
+        ]
+
+    def best_move(self):
+        '''
+        Choisit le coup le plus simulé depuis la racine.
+
+        Returns:
+            Tuple[Move,float]: coup et proportion de victoires associée
+                               (None, 0 si aucun coup n'a été développé)
+        '''
+        return best_of(self.root_stats())
+
+def simulate(board, player, policy):
+    '''
+    Termine la partie sur le plateau (sans l'annuler) en choisissant les coups
+    selon une politique de simulation. La simulation s'arrête dès que l'oracle
+    reconnaît une position décidée.
+
+    Args:
+        board (Board): plateau de départ
+        player (int): joueur devant jouer
+        policy (RandomPolicy): politique de simulation
+
+    Returns:
+        Tuple[int,int]: vainqueur et nombre de coups joués
+    '''
+    outcome = oracle(board.m, board.n).outcome
+    choose = policy.choose
+    plies = 0
+    winner = board.winner
+    while winner is None:
+        decided = outcome(board.bits, player)
+        if decided is not None:
+            return decided[0], plies
+        moves = board.possible_moves(player)
+        if not moves:  # le joueur bloqué déclare forfait
+            return (PLAYER1+PLAYER2)-player, plies
+        board.move(choose(board, player, moves))
+        plies += 1
+        player = (PLAYER1+PLAYER2)-player
+        winner = board.winner
+    return winner, plies
+
+def best_of(stats):
+    '''
+    Choisit le coup le plus simulé.
+
+    Args:
+        stats (List[Tuple[Move,int,int]]): (coup, simulations, victoires)
+
+    Returns:
+        Tuple[Move,float]: coup et proportion de victoires associée
+                           (None, 0 si la liste est vide)
+    '''
+    if not stats:
+        return None, 0
+    move, plays, wins = max(stats, key=lambda stat: stat[1])
+    return move, wins/max(plays, 1)
+
+def merge_stats(*all_stats):
+    '''
+    Fusionne les statistiques de racine de plusieurs arbres indépendants en
+    additionnant, coup par coup, les simulations et les victoires.
+
+    Args:
+        all_stats (List[Tuple[Move,int,int]]): statistiques de chaque arbre
+
+    Returns:
+        List[Tuple[Move,int,int]]: statistiques fusionnées
+    '''
+    merged = {}
+    for stats in all_stats:
+        for move, plays, wins in stats:
+            total = merged.setdefault(move, [0, 0])
+            total[0] += plays
+            total[1] += wins
+    return [(move, plays, wins) for move, (plays, wins) in merged.items()]
+
+def root_search(board, player_id, exploration, time_budget, seed, policy=None,
+                rave=RAVE_K):
+    '''
+    Recherche indépendante lancée dans un processus du pool (parallélisation à
+    la racine).
+
+    Args:
+        board (Board): copie du plateau dans sa position actuelle
+        player_id (int): joueur pour lequel on cherche un coup
+        exploration (float): constante d'exploration
+        time_budget (float): temps alloué en secondes
+        seed (int): graine du générateur aléatoire du processus
+        policy (RandomPolicy): politique de simulation (None pour celle par défaut)
+        rave (float): paramètre d'équivalence k de RAVE (0 pour UCT seul)
+
+    Returns:
+        Tuple[List[Tuple[Move,int,int]],int]:
+            statistiques de la racine et nombre de simulations effectuées
+    '''
+    random_seed(seed)
+    search = UctSearch(player_id, exploration, policy=policy, rave=rave)
+    search.run(board, time_budget)
+    return search.root_stats(), search.simulations
+
+def leaf_rollouts(board, player, batch, seed, policy=None):
+    '''
+    Simule plusieurs parties depuis une même feuille (parallélisation aux feuilles).
+
+    Args:
+        board (Board): copie du plateau dans la position de la feuille
+        player (int): joueur devant jouer
+        batch (int): nombre de simulations
+        seed (int): graine du générateur aléatoire du processus
+        policy (RandomPolicy): politique de simulation (None pour celle par défaut)
+
+    Returns:
+        List[int]: nombre de victoires de PLAYER1 et de PLAYER2
+    '''
+    random_seed(seed)
+    policy = HeavyPolicy() if policy is None else policy
+    wins = [0, 0]
+    for _ in range(batch):
+        winner, plies = simulate(board, player, policy)
+        for _ in range(plies):
+            board.undo()
+        wins[winner-1] += 1
+    return wins
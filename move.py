@@ -14,6 +14,8 @@ class Move:
         self.src_ = src
         self.dest_ = dest
         self.player_ = player
+        # les coups servent de clés (statistiques AMAF, historique) : hash précalculé
+        self.hash_ = hash((src, dest, player))
 
     @property
     def src(self):
@@ -40,5 +42,13 @@ class Move:
         '''
         return Move(self.dest_, self.src_, self.player_)
 
+    def __eq__(self, other):
+        ''' Retourne self == other '''
+        return isinstance(other, Move) and self.src_ == other.src_ \
+           and self.dest_ == other.dest_ and self.player_ == other.player_
+
+    def __hash__(self):
+        return self.hash_
+
     def __str__(self):
         return f'<{self.player_} moves from {self.src_} to {self.dest_}>'
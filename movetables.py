@@ -0,0 +1,82 @@
+from functools import lru_cache
+
+from const import *
+from move import Move
+from pos2d import Pos2D
+
+@lru_cache(maxsize=None)
+def move_table(rows, cols, player):
+    '''
+    Génère (une seule fois par taille de plateau et par joueur) les déplacements
+    possibles depuis chaque case, dans l'ordre de VALID_MOVES. Les coups sont créés
+    ici une fois pour toutes : la génération de coups se contente de parcourir la
+    table et de tester le contenu des cases d'arrivée.
+
+    Args:
+        rows (int): nombre de lignes du plateau
+        cols (int): nombre de colonnes du plateau
+        player (int): PLAYER1 ou PLAYER2
+
+    Returns:
+        Dict[Pos2D,Tuple[Tuple[Move,int,bool]]]:
+            pour chaque case de départ, triplets (coup, indice i*cols + j de la case
+            d'arrivée, True si le déplacement est en diagonale) ; seuls les
+            déplacements restant sur le plateau sont présents
+    '''
+    squares = Pos2D.squares(rows, cols)
+    table = {}
+    for src in squares:
+        entries = []
+        for delta in VALID_MOVES[player-1]:
+            row, col = src.row + delta.row, src.col + delta.col
+            if 0 <= row < rows and 0 <= col < cols:
+                dest = squares[row*cols + col]
+                entries.append((Move(src, dest, player), row*cols + col, delta.col != 0))
+        table[src] = tuple(entries)
+    return table
+
+@lru_cache(maxsize=None)
+def attack_table(rows, cols, player):
+    '''
+    Génère (une seule fois par taille de plateau et par joueur) les cases
+    attaquées par un pion depuis chaque case, c'est-à-dire ses diagonales avant.
+    Les cases d'où un pion de `player` est menacé sont celles qu'attaquerait un
+    pion adverse à sa place : attack_table(rows, cols, adversaire).
+
+    Args:
+        rows (int): nombre de lignes du plateau
+        cols (int): nombre de colonnes du plateau
+        player (int): PLAYER1 ou PLAYER2
+
+    Returns:
+        Tuple[Tuple[int]]: à l'indice i*cols + j, indices des cases attaquées par
+                           un pion de `player` en case (i, j)
+    '''
+    return tuple(
+        tuple(dest for _, dest, diagonal in move_table(rows, cols, player)[src] if diagonal) \
+        for src in Pos2D.squares(rows, cols)
+    )
+
+@lru_cache(maxsize=None)
+def source_table(rows, cols, player):
+    '''
+    Génère (une seule fois par taille de plateau et par joueur) les cases dont les
+    coups possibles peuvent changer quand le contenu d'une case change : la case
+    elle-même et celles depuis lesquelles un pion peut l'atteindre.
+
+    Args:
+        rows (int): nombre de lignes du plateau
+        cols (int): nombre de colonnes du plateau
+        player (int): PLAYER1 ou PLAYER2
+
+    Returns:
+        Tuple[Tuple[Tuple[int,Pos2D]]]:
+            à l'indice i*cols + j, paires (indice, case) de la case (i, j) et des
+            cases d'où un pion de `player` peut s'y déplacer
+    '''
+    squares = Pos2D.squares(rows, cols)
+    sources = [[(idx, src)] for idx, src in enumerate(squares)]
+    for idx, src in enumerate(squares):
+        for _, dest, _ in move_table(rows, cols, player)[src]:
+            sources[dest].append((idx, src))
+    return tuple(map(tuple, sources))
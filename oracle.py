@@ -0,0 +1,159 @@
+from functools import lru_cache
+
+from const import *
+
+class Oracle:
+    '''
+    Détection des positions décidées à très courte échéance, sur les masques de
+    bits des pions (bit i*n + j pour la case (i, j), cf. BitBoard.bits) :
+    - le joueur au trait gagne en un coup s'il a un pion sur l'avant-dernière
+      ligne pouvant atteindre la ligne d'arrivée, ou s'il peut prendre le dernier
+      pion adverse ;
+    - sinon, l'adversaire gagne en deux coups s'il a un tel coureur que le joueur
+      au trait ne peut pas prendre, ou au moins deux coureurs (un seul peut être
+      pris). Aucun pion ne peut revenir en arrière pour bloquer un coureur :
+      seule la prise l'arrête.
+
+    Args:
+        rows (int): nombre de lignes du plateau
+        cols (int): nombre de colonnes du plateau
+    '''
+    def __init__(self, rows, cols):
+        self.m_ = rows
+        self.n_ = cols
+        full = (1 << (rows*cols)) - 1
+        first_col = 0
+        for i in range(rows):
+            first_col |= 1 << (i*cols)
+        row = lambda i: ((1 << cols) - 1) << (i*cols)
+        self.full_ = full
+        self.not_first_col_ = full & ~first_col
+        self.not_last_col_ = full & ~(first_col << (cols-1))
+        # lignes d'arrivée et avant-dernières lignes de PLAYER1 et PLAYER2
+        self.goal_ = (row(0), row(rows-1))
+        self.runner_rows_ = (row(1), row(rows-2)) if rows > 1 else (0, 0)
+
+    def advance(self, bits, player, dj):
+        '''
+        Déplace tous les pions d'un masque d'une ligne vers l'avant.
+
+        Args:
+            bits (int): masque des pions
+            player (int): joueur à qui appartiennent les pions
+            dj (int): -1, 0 ou 1 (décalage de colonne)
+
+        Returns:
+            int: masque des cases atteintes (les pions sortant du plateau disparaissent)
+        '''
+        n = self.n_
+        if dj < 0:
+            bits &= self.not_first_col_
+        elif dj > 0:
+            bits &= self.not_last_col_
+        if player == PLAYER1:
+            return bits >> (n-dj)
+        return (bits << (n+dj)) & self.full_
+
+    def retreat(self, bits, player, dj):
+        '''
+        Opération inverse de advance : cases d'où un pion de `player` atteint
+        les cases du masque par un déplacement de colonne dj.
+
+        Args:
+            bits (int): masque des cases d'arrivée
+            player (int): joueur
+            dj (int): -1, 0 ou 1 (décalage de colonne du déplacement)
+
+        Returns:
+            int: masque des cases de départ
+        '''
+        n = self.n_
+        if player == PLAYER1:
+            bits = (bits << (n-dj)) & self.full_
+        else:
+            bits >>= n+dj
+        # le pion de départ doit lui-même pouvoir se décaler de dj
+        if dj < 0:
+            bits &= self.not_first_col_
+        elif dj > 0:
+            bits &= self.not_last_col_
+        return bits
+
+    def attacks(self, bits, player):
+        '''
+        Args:
+            bits (int): masque des pions
+            player (int): joueur à qui appartiennent les pions
+
+        Returns:
+            int: masque des cases attaquées (diagonales avant)
+        '''
+        return self.advance(bits, player, -1) | self.advance(bits, player, 1)
+
+    def runners(self, bits, player):
+        '''
+        Args:
+            bits (List[int]): masques des pions de PLAYER1 et de PLAYER2
+            player (int): joueur
+
+        Returns:
+            int: masque des pions de `player` pouvant atteindre leur ligne d'arrivée
+                 au prochain coup
+        '''
+        own = bits[player-1]
+        goal = self.goal_[player-1]
+        candidates = own & self.runner_rows_[player-1]
+        if not candidates:
+            return 0
+        open_diagonal = goal & ~own
+        empty = goal & ~(own | bits[2-player])
+        return candidates & (
+            self.retreat(open_diagonal, player, -1) \
+            | self.retreat(open_diagonal, player, 1) \
+            | self.retreat(empty, player, 0)
+        )
+
+    def outcome(self, bits, player):
+        '''
+        Cherche si une position non finale est décidée à très courte échéance.
+
+        Args:
+            bits (List[int]): masques des pions de PLAYER1 et de PLAYER2
+            player (int): joueur au trait
+
+        Returns:
+            Tuple[int,int]: vainqueur et nombre de coups avant la fin de la partie
+                            (1 ou 2), None si l'oracle ne conclut pas
+        '''
+        other = (PLAYER1+PLAYER2)-player
+        own, enemy = bits[player-1], bits[other-1]
+        # cas le plus fréquent : aucun pion sur les avant-dernières lignes
+        if own & self.runner_rows_[player-1] and self.runners(bits, player):
+            return player, 1
+        attacks = None
+        if enemy & (enemy-1) == 0:
+            attacks = self.attacks(own, player)
+            if attacks & enemy:  # prise du dernier pion adverse
+                return player, 1
+        if enemy & self.runner_rows_[other-1]:
+            runners = self.runners(bits, other)
+            if runners & (runners-1):
+                return other, 2
+            if runners:
+                if attacks is None:
+                    attacks = self.attacks(own, player)
+                if not runners & attacks:
+                    return other, 2
+        return None
+
+@lru_cache(maxsize=None)
+def oracle(rows, cols):
+    '''
+    Args:
+        rows (int): nombre de lignes du plateau
+        cols (int): nombre de colonnes du plateau
+
+    Returns:
+        Oracle: oracle (partagé) des plateaux de taille donnée
+    '''
+    return Oracle(rows, cols)
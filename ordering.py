@@ -0,0 +1,134 @@
+from random import shuffle
+
+from const import *
+
+class MoveOrderer:
+    '''
+    Ordonnancement des coups pour une recherche avec coupures (alpha-beta).
+
+    Combine des critères statiques (coup de la variation principale, meilleur coup
+    connu, coups gagnants, captures, distance à la ligne d'arrivée) et deux
+    heuristiques apprises pendant la recherche :
+    - coups killers : pour chaque profondeur depuis la racine, les derniers coups
+      calmes (sans capture) ayant provoqué une coupure, essayés juste après les
+      captures car souvent bons aussi dans les positions voisines ;
+    - historique : pour chaque (joueur, case de départ, case d'arrivée), somme des
+      depth² des coupures provoquées, qui départage les autres coups calmes.
+
+    Args:
+        rows (int): nombre de lignes du plateau
+        cols (int): nombre de colonnes du plateau
+        killers (int): nombre de coups killers conservés par profondeur
+
+    Attributes:
+        killers (List[List[Move]]): coups killers de chaque profondeur
+    '''
+    def __init__(self, rows, cols, killers=KILLER_SLOTS):
+        self.m_ = rows
+        self.n_ = cols
+        self.slots_ = killers
+        self.killers_ = []
+        self.history_ = [0] * (2 * (rows*cols)**2)
+
+    @property
+    def killers(self):
+        return self.killers_
+
+    def history_index(self, move):
+        '''
+        Args:
+            move (Move): coup
+
+        Returns:
+            int: indice du coup dans la table d'historique
+        '''
+        squares = self.m_*self.n_
+        src = move.src.row*self.n_ + move.src.col
+        dest = move.dest.row*self.n_ + move.dest.col
+        return ((move.player-1)*squares + src)*squares + dest
+
+    def history_score(self, move):
+        '''
+        Args:
+            move (Move): coup
+
+        Returns:
+            int: score d'historique du coup
+        '''
+        return self.history_[self.history_index(move)]
+
+    def new_search(self):
+        '''
+        Prépare une nouvelle recherche : les coups killers sont oubliés (les
+        profondeurs ne correspondent plus) et l'historique est divisé par deux,
+        pour que les coupures récentes comptent davantage que les anciennes.
+        '''
+        self.killers_ = []
+        self.history_ = [score >> 1 for score in self.history_]
+
+    def clear(self):
+        '''
+        Oublie tout ce qui a été appris.
+        '''
+        self.killers_ = []
+        self.history_ = [0] * len(self.history_)
+
+    def order(self, board, moves, player, ply=0, best_move=None, pv_move=None):
+        '''
+        Trie les coups du plus prometteur au moins prometteur : d'abord le coup de
+        la variation principale précédente, puis le meilleur coup connu (table de
+        transposition), puis les coups gagnants, puis les captures, puis les coups
+        killers de cette profondeur, puis les autres coups par score d'historique
+        décroissant puis par distance à la ligne d'arrivée. Les coups équivalents
+        sont mélangés pour conserver le choix aléatoire entre coups de même score.
+
+        Args:
+            board (Board): plateau dans la position où les coups sont joués
+            moves (List[Move]): coups à trier (modifiée en place)
+            player (int): joueur effectuant les coups
+            ply (int): profondeur depuis la racine de la recherche
+            best_move (Move): coup à essayer en premier (None si aucun)
+            pv_move (Move): coup de la variation principale (None si aucun)
+
+        Returns:
+            List[Move]: la liste `moves` triée
+        '''
+        goal_row = 0 if player == PLAYER1 else board.m-1
+        other_player = (PLAYER1+PLAYER2)-player
+        owner = board.owner
+        killers = self.killers_[ply] if ply < len(self.killers_) else ()
+        history = self.history_
+        index = self.history_index
+        shuffle(moves)
+        moves.sort(key=lambda move: (
+            move != pv_move,
+            move != best_move,
+            move.dest.row != goal_row,
+            owner(move.dest) != other_player,
+            move not in killers,
+            -history[index(move)],
+            abs(move.dest.row - goal_row)
+        ))
+        return moves
+
+    def cutoff(self, board, move, ply, depth):
+        '''
+        Enregistre un coup ayant provoqué une coupure. À appeler dans la position
+        où le coup a été joué (après l'avoir annulé).
+
+        Args:
+            board (Board): plateau
+            move (Move): coup ayant provoqué la coupure
+            ply (int): profondeur depuis la racine de la recherche
+            depth (int): nombre de couches restantes sous le coup
+        '''
+        if board.owner(move.dest) != EMPTY:
+            # les captures sont déjà essayées tôt
+            return
+        while len(self.killers_) <= ply:
+            self.killers_.append([])
+        killers = self.killers_[ply]
+        if move not in killers:
+            killers.insert(0, move)
+            del killers[self.slots_:]
+        self.history_[self.history_index(move)] += depth*depth
@@ -3,9 +3,18 @@ from pos2d import Pos2D
 class PegsList:
     '''
     Liste des pions d'un joueur.
+
+    Les positions sont rangées dans une liste, et un dictionnaire donne l'indice
+    de chaque position dans cette liste : ajout, retrait et déplacement se font en
+    temps constant. Un retrait place le dernier pion dans la case libérée ;
+    restore annule exactement le dernier retrait, si bien que l'ordre d'itération
+    ne dépend que de la suite des coups joués et est rétabli par leur annulation.
     '''
     def __init__(self):
         self.positions_ = []
+        self.slots_ = {}
+        # indices libérés par les retraits successifs (cf. restore)
+        self.removed_ = []
 
     def add(self, pos):
         '''
@@ -14,6 +23,7 @@ class PegsList:
         Args:
             pos (Pos2D): position du pion à ajouter
         '''
+        self.slots_[pos] = len(self.positions_)
         self.positions_.append(pos)
 
     def remove(self, pos):
@@ -22,8 +32,38 @@ class PegsList:
 
         Args:
             pos (Pos2D): position du pion à retirer
+
+        Raises:
+            ValueError: si aucun pion n'est en position `pos`
         '''
-        self.positions_.remove(pos)
+        try:
+            slot = self.slots_.pop(pos)
+        except KeyError:
+            raise ValueError(f'Aucun pion en position {pos}')
+        last = self.positions_.pop()
+        if last is not pos:
+            self.positions_[slot] = last
+            self.slots_[last] = slot
+        self.removed_.append(slot)
+
+    def restore(self, pos):
+        '''
+        Annule le dernier retrait : le pion retrouve sa place dans l'ordre
+        d'itération.
+
+        Args:
+            pos (Pos2D): position du dernier pion retiré
+        '''
+        slot = self.removed_.pop()
+        positions = self.positions_
+        if slot < len(positions):
+            moved = positions[slot]
+            self.slots_[moved] = len(positions)
+            positions.append(moved)
+            positions[slot] = pos
+        else:
+            positions.append(pos)
+        self.slots_[pos] = slot
 
     def move(self, move):
         '''
@@ -32,8 +72,9 @@ class PegsList:
         Args:
             move (Move): déplacement du joueur
         '''
-        idx = self.positions_.index(move.src)
-        self.positions_[idx] = move.dest
+        slot = self.slots_.pop(move.src)
+        self.positions_[slot] = move.dest
+        self.slots_[move.dest] = slot
 
     def has_intersection_with(self, other):
         '''
@@ -46,11 +87,13 @@ class PegsList:
         Returns:
             bool: True s'il y a au moins une position en commun et False sinon
         '''
-        return len(set(self) & set(other)) > 0
+        return any(pos in self.slots_ for pos in other)
+
+    def __contains__(self, pos):
+        return pos in self.slots_
 
     def __iter__(self):
         return iter(self.positions_)
 
     def __len__(self):
         return len(self.positions_)
-
@@ -1,14 +1,22 @@
 from __future__ import division
-import sys
 import copy
+import sys
 import time
-from random import choice, choices, randint
+from concurrent.futures import ProcessPoolExecutor
+from random import choice, choices, getrandbits, randint, shuffle
 from breakthrough import *
 from abc import ABCMeta, abstractmethod
 from random import choice
 from math import log, sqrt
 from const import *
+from errors import SearchTimeoutError
+from evaluation import Evaluator
 from move import Move
+from oracle import oracle
+from ordering import MoveOrderer
+from mcts import UctSearch, best_of, merge_stats, root_search
+from stats import InstrumentedBoard, SearchStats
+from transposition import TranspositionTable
 import operator
 
 class Player(metaclass=ABCMeta):
@@ -44,9 +52,75 @@ class Player(metaclass=ABCMeta):
 class AiPlayer(Player):
     '''
     Classe abstraite représentant un joueur AI.
+
+    Attributes:
+        stats_hook (Callable[[SearchStats],None]):
+            fonction appelée avec les statistiques de chaque recherche
+            (None : recherche non instrumentée)
+        book (OpeningBook): bibliothèque d'ouvertures consultée avant de
+                            chercher un coup (None si aucune)
     '''
-    def __init__(self, player_id, board):
+    def __init__(self, player_id, board, book=None):
         super().__init__(player_id, board)
+        self.stats_hook_ = None
+        self.book_ = book
+
+    @property
+    def stats_hook(self):
+        return self.stats_hook_
+
+    @stats_hook.setter
+    def stats_hook(self, hook):
+        self.stats_hook_ = hook
+
+    @property
+    def book(self):
+        return self.book_
+
+    @book.setter
+    def book(self, book):
+        self.book_ = book
+
+    def _book_move(self):
+        '''
+        Cherche la position actuelle dans la bibliothèque d'ouvertures.
+
+        Returns:
+            Move: coup de la bibliothèque (None si aucun)
+        '''
+        if self.book_ is None:
+            return None
+        return self.book_.move_for(self.board_, self.player_id_)
+
+    def _instrumented(self, search, timed=True):
+        '''
+        Lance une recherche en collectant ses statistiques, puis les transmet
+        au hook.
+
+        Args:
+            search (Callable[[SearchStats],Move]):
+                recherche à lancer ; elle complète les statistiques qui lui
+                sont propres et renvoie le coup choisi
+            timed (bool): True pour mesurer les temps par phase (le plateau est
+                          alors remplacé par un InstrumentedBoard pendant la recherche)
+
+        Returns:
+            Move: coup choisi par la recherche
+        '''
+        stats = SearchStats(self.player_id_)
+        board = self.board_
+        if timed:
+            self.board_ = InstrumentedBoard(board, stats)
+        start = time.perf_counter()
+        try:
+            stats.move = search(stats)
+        finally:
+            if timed:
+                self.board_.close()
+            self.board_ = board
+        stats.total_time = time.perf_counter() - start
+        self.stats_hook_(stats)
+        return stats.move
 
 class RandomAiPlayer(AiPlayer):
     '''
@@ -95,141 +169,389 @@ class GreedyAiPlayer(AiPlayer):
                 best_peg = peg
         return best_peg
 
-"""
-Class MonteCarlo(AiPlayer):
-    Args:
-        Player_id (Class AiPlayer)
-        Board(Class AiPlayer)
-    Attribute:
-        Liste d'état
-        Dict Victoire
-        Dict Game
-        Constante d'exploration Non Fonctionnel
-        Stats : Q(Vi)/N(Vi) Fonctionnel
-"""
 class MonteCarlo(AiPlayer):
+    '''
+    Joueur IA appliquant une recherche arborescente Monte-Carlo (UCT).
+    L'arbre de recherche est conservé d'un coup à l'autre : le sous-arbre du coup
+    joué (et de la réponse adverse) sert de point de départ à la recherche suivante.
 
-    def __init__(self, player_id, board):
-        super().__init__(player_id, board)
-        self.states = []
-        self.wins = {}
-        self.plays = {}
-        self.C = 1.4
-        self.stats={}
-        
-     
-    def carlo(self):
-        current_player = self.player_id_
-        poss_moves = self.board_.possible_moves(current_player)
-        if len(poss_moves) == 0: #Gain de temps d'éxecution
-            return
-        
-        for move in poss_moves: #Pour chaque coup possible depuis l'état initial on va simuler une partie déterminer son résulat puis la retourner sous forme de statistique
-            start_time = time.time()
-            games = 0
-            self.count = 0
-            while time.time() - start_time < ALLOWED_TIME_IN_S/len(poss_moves): 
-                self._run_simulation(self.next(self.board_,move)) #On simule une partie avec comme base l'un des enfants de la racine
-                games +=1
-            pct = self.count/float(games) #Q(Vi)/N(Vi) 
-            self.stats[move] = pct
-
-        max_key = max(self.stats.items(),key=operator.itemgetter(1))[0]
-        pct = self.stats[max_key]
-        return pct,max_key #Renvoie le meilleur coup pour le meilleur pourcentage 
-    
-    def next(self, board, move):
-        tmp = copy.deepcopy(board)
-        tmp.move(move)
-        return tmp
+    Avec workers > 1, les simulations sont réparties sur un pool de processus :
+    - ROOT_PARALLEL : chaque processus construit son propre arbre pendant le temps
+      alloué, puis les statistiques de la racine sont additionnées coup par coup ;
+    - LEAF_PARALLEL : un seul arbre, dont les feuilles sont simulées par lots de
+      `batch` parties dans les processus du pool.
 
+    Args:
+        player_id (int): PLAYER1 ou PLAYER2
+        board (Board): plateau sur lequel jouer
+        table_size (int): nombre de cases de la table des positions
+        workers (int): nombre de processus (1 pour une recherche séquentielle)
+        parallel (str): ROOT_PARALLEL ou LEAF_PARALLEL
+        batch (int): nombre de simulations par feuille en LEAF_PARALLEL
+        book (OpeningBook): bibliothèque d'ouvertures (None si aucune)
+        time_budget (float): temps alloué par coup en secondes
+                             (ALLOWED_TIME_IN_S par défaut)
+        policy (RandomPolicy): politique de simulation (HeavyPolicy() par défaut)
+        rave (float): paramètre d'équivalence k de RAVE (0 pour UCT seul)
+
+    Attributes:
+        C (float): constante d'exploration
+        stats (Dict[Move,float]): proportion de victoires de chaque coup de la racine
     '''
-    Crée une simulation dans laquelle une partie se produit, Récupere le dernier état en date comme simulation de coup
-    La fonction next(board, move) permet de récupérer l'état du tableau après un coup aléatoire
-    '''
-    def _run_simulation(self,board):
-        visit_states = set()
-        plays, wins = self.plays, self.wins #Temps d'execution en moins
-        states_copy = self.states[:]
+    def __init__(self, player_id, board, table_size=TT_SIZE,
+                 workers=1, parallel=ROOT_PARALLEL, batch=LEAF_BATCH, book=None,
+                 time_budget=None, policy=None, rave=RAVE_K):
+        super().__init__(player_id, board, book)
+        self.time_budget_ = ALLOWED_TIME_IN_S if time_budget is None else time_budget
+        self.C = UCT_C
+        self.stats = {}
+        self.search_ = UctSearch(player_id, self.C, table_size, policy, rave)
+        self.workers_ = workers
+        self.parallel_ = parallel
+        self.batch_ = batch
+        self.executor_ = None
+        self.rollouts_ = 0
 
-        if len(states_copy) != 0: #S'il existe un état précedant, partir de là
-            state = states_copy[-1]
+    def carlo(self):
+        '''
+        Lance la recherche pendant le temps alloué par coup.
+
+        Returns:
+            Tuple[float,Move]: proportion de victoires et meilleur coup
+                               (None si aucun coup n'est possible)
+        '''
+        search = self.search_
+        search.exploration = self.C
+        if self.workers_ <= 1:
+            search.run(self.board_, self.time_budget_)
+            stats = search.root_stats()
+            self.rollouts_ = search.simulations
+        elif self.parallel_ == LEAF_PARALLEL:
+            search.run_leaf_parallel(
+                self.board_, self.time_budget_, self.executor,
+                self.workers_, self.batch_
+            )
+            stats = search.root_stats()
+            self.rollouts_ = search.simulations
         else:
-            state = board
+            stats = self.__root_parallel()
+        self.stats = {move: wins/max(plays, 1) for move, plays, wins in stats}
+        move, pct = best_of(stats)
+        return pct, move
+
+    def __root_parallel(self):
+        '''
+        Parallélisation à la racine : workers-1 processus construisent chacun un
+        arbre indépendant pendant que ce processus-ci poursuit son propre arbre
+        (réutilisé d'un coup à l'autre).
+
+        Returns:
+            List[Tuple[Move,int,int]]: statistiques fusionnées de la racine
+        '''
+        # le plateau est copié : il n'est sérialisé vers le pool qu'en tâche de fond,
+        # pendant que la recherche locale le modifie
+        futures = [
+            self.executor.submit(
+                root_search, copy.deepcopy(self.board_), self.player_id_, self.C,
+                self.time_budget_, getrandbits(32), self.search_.policy,
+                self.search_.rave
+            ) \
+            for _ in range(self.workers_-1)
+        ]
+        self.search_.run(self.board_, self.time_budget_)
+        results = [future.result() for future in futures]
+        self.rollouts_ = self.search_.simulations \
+                       + sum(simulations for _, simulations in results)
+        return merge_stats(self.search_.root_stats(), *(stats for stats, _ in results))
+
+    @property
+    def executor(self):
+        if self.executor_ is None:
+            self.executor_ = ProcessPoolExecutor(self.workers_)
+        return self.executor_
+
+    def close(self):
+        '''
+        Arrête le pool de processus (s'il a été créé).
+        '''
+        if self.executor_ is not None:
+            self.executor_.shutdown()
+            self.executor_ = None
 
-        current_player = self.player_id_
-        other_player = (PLAYER1+PLAYER2)-current_player
-        current_player, other_player = other_player, current_player
-        flag = True
-        expand = True
-
-        while flag: #Tant que la partie n'a pas de vainqueur
-            poss_moves = state.possible_moves(current_player)
-            if len(poss_moves) == 0: #Si aucun coup recupere du temps
-                return
-
-            next_states = [(move, self.next(state,move)) for move in poss_moves] #On initialise les enfants du noeud
-
-            if all(state in plays for p, state in next_states): #Si tout les enfants sont explorées on instance l'UCT1
-                next_move = []
-                for move,state in next_states:
-                    s_i = plays[(current_player,state)]
-                    w_i = wins[(current_player,state)]
-                    s_p = sum(plays[(current_player,s)] for p,s in next_states)
-                    r = w_i/s_i + self.C * sqrt(log(s_p)/s_i)
-                    next_move.append((r,move))
-                    
-                _, move = sorted(next_move)[-1]
-            else:
-                tmp = choices(next_states)
-                move,state = tmp[0]
-            
-
-            states_copy.append(state) #On copie le dernier état
-            
-            if (expand and not (current_player,state) in plays): #Si Le noeud s'étant alors on place dans le dictionnaire les enfants du noeud choisit aléatoirement
-                expand = False
-                self.plays[(current_player,state)] = 0
-                self.wins[(current_player,state)] = 0
-
-            
-            visit_states.add((current_player,state))
-            current_player, other_player = other_player, current_player #Modifie le tour de jeu
-            winner = state.winner
-            if winner is not None: 
-                flag = False
-
-
-        winner = state.winner
-        if winner == PLAYER2:
-            self.count +=1
-        for player,state in visit_states: #Rétropropagation, Bug concernant la constante d'exploration :/
-            if (player,state) not in plays:
-                continue
-            plays[(player,state)] += 1
-            if player == winner:
-                wins[(player,state)] +=1
-            
     def _play(self):
-        try:
-            pct, move = self.carlo() #Méthode abstraite hérité de Player
+        move = self._book_move()
+        if move is not None:
             return move
-        except Exception as w:
-            print(w)
+        if self.stats_hook_ is not None:
+            # en parallèle, seuls les temps du processus courant seraient mesurés
+            return self._instrumented(self.__search_with_stats, self.workers_ <= 1)
+        pct, move = self.carlo() #Méthode abstraite hérité de Player
+        return move
+
+    def __search_with_stats(self, stats):
+        '''
+        Lance carlo() et complète les statistiques de la recherche.
+
+        Args:
+            stats (SearchStats): statistiques à compléter
+
+        Returns:
+            Move: meilleur coup
+        '''
+        table = self.search_.table
+        hits, probes = table.hits, table.probes
+        pct, move = self.carlo()
+        stats.score = pct
+        stats.rollouts = self.rollouts_
+        stats.nodes = len(table)
+        stats.depth = self.search_.tree_depth()
+        stats.tt_hits = table.hits - hits
+        stats.tt_probes = table.probes - probes
+        return move
 
 class MinimaxAiPlayer(AiPlayer):
     '''
-    Joueur IA appliquant l'algorithme minimax.
+    Joueur IA appliquant l'algorithme minimax avec élagage alpha-beta.
+    La recherche procède par approfondissement itératif (profondeur 1, 2, ...)
+    jusqu'à la profondeur maximale ou jusqu'à épuisement du temps alloué ; le coup
+    joué est celui de la dernière itération terminée.
+
+    Args:
+        player_id (int): PLAYER1 ou PLAYER2
+        board (Board): plateau sur lequel jouer
+        depth (int): profondeur maximale de recherche (DEPTH par défaut)
+        table_size (int): nombre de cases de la table de transposition
+        time_budget (float): temps alloué par coup en secondes
+                             (ALLOWED_TIME_IN_S par défaut)
+        evaluator (Evaluator): évaluation des feuilles non finales (Evaluator() par
+                               défaut), associée au plateau le temps de chaque
+                               recherche seulement
+        book (OpeningBook): bibliothèque d'ouvertures (None si aucune)
+        tablebase (Tablebase): table de finales consultée aux feuilles (None si aucune)
+        orderer (MoveOrderer): ordonnancement des coups (par défaut, un MoveOrderer
+                               propre à ce joueur)
+
+    Attributes:
+        pv (List[Move]): variation principale de la dernière itération terminée
+        tablebase (Tablebase): table de finales consultée aux feuilles
+        orderer (MoveOrderer): ordonnancement des coups
+        evaluator (Evaluator): évaluation des feuilles non finales
     '''
-    DEPTH = 3
+    DEPTH = 5
+    # nombre de noeuds entre deux vérifications de l'heure
+    TIME_CHECK_INTERVAL = 256
+
+    def __init__(self, player_id, board, depth=None, table_size=TT_SIZE,
+                 time_budget=None, evaluator=None, book=None, tablebase=None,
+                 orderer=None):
+        super().__init__(player_id, board, book)
+        self.tablebase_ = tablebase
+        self.orderer_ = MoveOrderer(board.m, board.n) if orderer is None else orderer
+        self.oracle_ = oracle(board.m, board.n)
+        self.evaluator_ = Evaluator() if evaluator is None else evaluator
+        self.attached_ = False
+        self.depth_ = MinimaxAiPlayer.DEPTH if depth is None else depth
+        self.time_budget_ = ALLOWED_TIME_IN_S if time_budget is None else time_budget
+        self.table_ = TranspositionTable(table_size)
+        self.deadline_ = None
+        self.nodes_ = 0
+        self.cutoffs_ = 0
+        self.completed_depth_ = 0
+        self.pv_ = []
+        self.pv_moves_ = {}
+        self.root_ply_ = len(board.history)
 
-    def __init__(self, player_id, board):
-        super().__init__(player_id, board)
+    @property
+    def pv(self):
+        return self.pv_
+
+    @property
+    def tablebase(self):
+        return self.tablebase_
+
+    @property
+    def orderer(self):
+        return self.orderer_
+
+    @property
+    def evaluator(self):
+        return self.evaluator_
+
+    @tablebase.setter
+    def tablebase(self, tablebase):
+        self.tablebase_ = tablebase
+
+    def tablebase_score(self, maximizing):
+        '''
+        Consulte la table de finales pour la position actuelle. Une victoire
+        en d coups après la feuille vaut WIN-d, comme une victoire trouvée par la
+        recherche avec -d couches restantes.
+
+        Args:
+            maximizing (bool): True si ce joueur est au trait
+
+        Returns:
+            int: score exact de la position (None si elle n'est pas dans la table)
+        '''
+        to_move = self.player_id_ if maximizing else (PLAYER1+PLAYER2)-self.player_id_
+        result = self.tablebase_.probe(self.board_, to_move)
+        if result is None:
+            return None
+        win, distance = result
+        # les scores de victoire doivent rester au-delà de WIN//2 (cf. _to_table_score)
+        distance = min(distance, WIN//2 - 1)
+        score = WIN-distance if win else LOSS+distance
+        return score if maximizing else -score
 
     def _play(self):
-        move, _ = self.minimax(MinimaxAiPlayer.DEPTH)
+        move = self._book_move()
+        if move is not None:
+            return move
+        return self._with_evaluator(self.__search)
+
+    def __search(self):
+        '''
+        Lance iterative_deepening (instrumenté si un hook est installé).
+
+        Returns:
+            Move: meilleur coup
+        '''
+        if self.stats_hook_ is not None:
+            return self._instrumented(self.__search_with_stats)
+        move, _ = self.iterative_deepening(self.time_budget_, self.depth_)
         return move
 
+    def _with_evaluator(self, search, *args):
+        '''
+        Lance une recherche avec l'évaluateur de ce joueur associé au plateau, puis
+        rétablit l'évaluateur précédent : le plateau de la partie, partagé avec
+        l'adversaire, n'est tenu à jour que pendant les recherches de ce joueur.
+        Les appels imbriqués (recherche déjà en cours) ne réassocient rien.
+
+        Args:
+            search (Callable): recherche à lancer
+            args (Tuple): arguments de `search`
+
+        Returns:
+            résultat de `search`
+        '''
+        if self.attached_:
+            return search(*args)
+        board = self.board_
+        previous = board.evaluator
+        board.attach_evaluator(self.evaluator_)
+        self.attached_ = True
+        try:
+            return search(*args)
+        finally:
+            self.attached_ = False
+            board.attach_evaluator(previous)
+
+    def __search_with_stats(self, stats):
+        '''
+        Lance iterative_deepening et complète les statistiques de la recherche.
+
+        Args:
+            stats (SearchStats): statistiques à compléter
+
+        Returns:
+            Move: meilleur coup
+        '''
+        hits, probes = self.table_.hits, self.table_.probes
+        self.nodes_ = self.cutoffs_ = 0
+        move, stats.score = self.iterative_deepening(self.time_budget_, self.depth_)
+        stats.nodes = self.nodes_
+        stats.cutoffs = self.cutoffs_
+        stats.depth = self.completed_depth_
+        stats.tt_hits = self.table_.hits - hits
+        stats.tt_probes = self.table_.probes - probes
+        return move
+
+    def evaluate(self):
+        '''
+        Évalue une position non finale du point de vue de ce joueur.
+
+        Returns:
+            float: évaluation statique du plateau (DRAW si aucun évaluateur)
+        '''
+        evaluator = self.board_.evaluator
+        return DRAW if evaluator is None else evaluator.score_for(self.player_id_)
+
+    def iterative_deepening(self, time_budget, max_depth):
+        '''
+        Lance alphabeta à des profondeurs croissantes tant qu'il reste du temps.
+        La variation principale de chaque itération est jouée en premier à la
+        suivante, ce qui rend les coupures plus précoces.
+
+        Args:
+            time_budget (float): temps alloué en secondes
+            max_depth (int): profondeur maximale
+
+        Returns:
+            Tuple[Move,int]: meilleur coup de la dernière itération terminée et son score
+        '''
+        if not self.attached_:
+            return self._with_evaluator(self.iterative_deepening, time_budget, max_depth)
+        board = self.board_
+        root_ply = self.root_ply_ = len(board.history)
+        self.table_.new_search()
+        self.orderer_.new_search()
+        self.pv_moves_ = {}
+        self.deadline_ = time.time() + time_budget
+        self.completed_depth_ = 0
+        best_move, best_reward = None, DRAW
+        try:
+            for depth in range(1, max_depth+1):
+                try:
+                    move, reward = self.alphabeta(depth)
+                except SearchTimeoutError:
+                    # on remet le plateau dans la position de la racine
+                    while len(board.history) > root_ply:
+                        board.undo()
+                    break
+                best_move, best_reward = move, reward
+                self.completed_depth_ = depth
+                pv = self.principal_variation(depth)
+                self.pv_moves_ = dict(pv)
+                self.pv_ = [move for _, move in pv]
+                if best_reward > WIN//2 or best_reward < LOSS//2:  # partie décidée
+                    break
+        finally:
+            self.deadline_ = None
+        if best_move is None:  # pas même une itération terminée
+            possible_moves = board.possible_moves(self.player_id_)
+            if possible_moves:
+                best_move = self.order_moves(possible_moves, self.player_id_)[0]
+        return best_move, best_reward
+
+    def principal_variation(self, depth):
+        '''
+        Reconstitue la variation principale en suivant les meilleurs coups stockés
+        dans la table de transposition.
+
+        Args:
+            depth (int): nombre maximal de coups
+
+        Returns:
+            List[Tuple[int,Move]]: paires (clé de la position, coup joué depuis celle-ci)
+        '''
+        board = self.board_
+        pv = []
+        player = self.player_id_
+        for _ in range(depth):
+            if board.winner is not None:
+                break
+            entry = self.table_.probe(board.key)
+            if entry is None or entry[3] is None \
+               or entry[3] not in board.possible_moves(player):
+                break
+            pv.append((board.key, entry[3]))
+            board.move(entry[3])
+            player = (PLAYER1+PLAYER2)-player
+        for _ in pv:
+            board.undo()
+        return pv
+
     def minimax(self, depth, maximizing=True):
         '''
         Implémentation de l'algorithme minimax.
@@ -241,13 +563,15 @@ class MinimaxAiPlayer(AiPlayer):
         Returns:
             Tuple[Move,int]: paire contenant le meilleur coup et le score associé
         '''
+        if not self.attached_:
+            return self._with_evaluator(self.minimax, depth, maximizing)
         winner = self.board_.winner  # pour vérifier si l'état est final
         if winner is not None:  # s'il l'est, on calcule le score associé
             score = WIN+depth if winner == self.player_id_ else LOSS-depth
             return None, score
         # sinon on regarde si on est sur une feuille ou si on continue d'explorer
         if depth == 0:  # si feuille, on renvoie le score d'un état non final
-            return None, DRAW
+            return None, self.evaluate()
         current_player = self.player_id_
         other_player = (PLAYER1+PLAYER2)-current_player
         if not maximizing:
@@ -273,6 +597,152 @@ class MinimaxAiPlayer(AiPlayer):
                 best_reward = reward  #                          l. 11
         return choice(best_moves), best_reward  #                l. 17
 
+    def order_moves(self, moves, player, best_move=None, pv_move=None):
+        '''
+        Trie les coups du plus prometteur au moins prometteur (cf. MoveOrderer.order).
+
+        Args:
+            moves (List[Move]): coups à trier (modifiée en place)
+            player (int): joueur effectuant les coups
+            best_move (Move): coup à essayer en premier (None si aucun)
+            pv_move (Move): coup de la variation principale (None si aucun)
+
+        Returns:
+            List[Move]: la liste `moves` triée
+        '''
+        return self.orderer_.order(
+            self.board_, moves, player, len(self.board_.history) - self.root_ply_,
+            best_move, pv_move
+        )
+
+    @staticmethod
+    def _to_table_score(score, depth):
+        '''
+        Rend un score de victoire/défaite indépendant de la profondeur restante
+        avant de le stocker dans la table de transposition.
+
+        Args:
+            score (int): score calculé avec `depth` couches restantes
+            depth (int): nombre de couches restantes
+
+        Returns:
+            int: score à stocker
+        '''
+        return score-depth if score > WIN//2 \
+          else score+depth if score < LOSS//2 \
+          else score
+
+    @staticmethod
+    def _from_table_score(score, depth):
+        '''
+        Opération inverse de _to_table_score.
+
+        Args:
+            score (int): score stocké
+            depth (int): nombre de couches restantes
+
+        Returns:
+            int: score ramené à `depth` couches restantes
+        '''
+        return score+depth if score > WIN//2 \
+          else score-depth if score < LOSS//2 \
+          else score
+
+    def alphabeta(self, depth, alpha=NEG_INF, beta=POS_INF, maximizing=True):
+        '''
+        Algorithme minimax avec élagage alpha-beta : les branches qui ne peuvent
+        pas modifier le résultat ne sont pas explorées. Donne le même score que
+        minimax en visitant bien moins de noeuds si les coups sont bien ordonnés.
+        Les positions déjà évaluées (à une profondeur suffisante) sont reprises de
+        la table de transposition.
+
+        Args:
+            depth (int): le nombre de "couches" restantes à parcourir
+            alpha (int): score minimal déjà garanti au joueur maximisant
+            beta (int): score maximal déjà garanti au joueur minimisant
+            maximizing (bool): True si le coup à chercher à cette étape
+                               vient du joueur `self.player_id`
+        Returns:
+            Tuple[Move,int]: paire contenant le meilleur coup et le score associé
+
+        Raises:
+            SearchTimeoutError: si le temps alloué par iterative_deepening est écoulé
+        '''
+        if not self.attached_:
+            return self._with_evaluator(self.alphabeta, depth, alpha, beta, maximizing)
+        self.nodes_ += 1
+        if self.deadline_ is not None \
+           and self.nodes_ % MinimaxAiPlayer.TIME_CHECK_INTERVAL == 0 \
+           and time.time() > self.deadline_:
+            raise SearchTimeoutError('Temps de recherche écoulé')
+        winner = self.board_.winner
+        if winner is not None:
+            score = WIN+depth if winner == self.player_id_ else LOSS-depth
+            return None, score
+        current_player = self.player_id_ if maximizing \
+                    else (PLAYER1+PLAYER2)-self.player_id_
+        # position décidée en 1 ou 2 coups (sauf à la racine, où il faut un coup)
+        if len(self.board_.history) > self.root_ply_:
+            decided = self.oracle_.outcome(self.board_.bits, current_player)
+            if decided is not None:
+                winner, plies = decided
+                return None, WIN+depth-plies if winner == self.player_id_ \
+                                             else LOSS-depth+plies
+        if depth == 0:
+            if self.tablebase_ is not None:
+                score = self.tablebase_score(maximizing)
+                if score is not None:
+                    return None, score
+            return None, self.evaluate()
+        key = self.board_.key
+        entry = self.table_.probe(key)
+        table_move = None
+        if entry is not None:
+            entry_depth, score, flag, table_move = entry
+            if entry_depth >= depth:
+                score = MinimaxAiPlayer._from_table_score(score, depth)
+                if flag == EXACT \
+                   or (flag == LOWER_BOUND and score >= beta) \
+                   or (flag == UPPER_BOUND and score <= alpha):
+                    return table_move, score
+        alpha_orig, beta_orig = alpha, beta
+        possible_moves = self.board_.possible_moves(current_player)
+        # le joueur qui ne peut plus jouer déclare forfait
+        if not possible_moves:
+            return None, LOSS-depth if maximizing else WIN+depth
+        best_move = None
+        best_reward = NEG_INF if maximizing else POS_INF
+        moves = self.order_moves(
+            possible_moves, current_player, table_move, self.pv_moves_.get(key)
+        )
+        for move in moves:
+            self.board_.move(move)
+            _, reward = self.alphabeta(depth-1, alpha, beta, not maximizing)
+            self.board_.undo()
+            if maximizing:
+                if reward > best_reward:
+                    best_move, best_reward = move, reward
+                alpha = max(alpha, best_reward)
+            else:
+                if reward < best_reward:
+                    best_move, best_reward = move, reward
+                beta = min(beta, best_reward)
+            if alpha >= beta:  # coupure : l'adversaire n'ira jamais ici
+                self.cutoffs_ += 1
+                self.orderer_.cutoff(
+                    self.board_, move, len(self.board_.history) - self.root_ply_, depth
+                )
+                break
+        flag = UPPER_BOUND if best_reward <= alpha_orig \
+          else LOWER_BOUND if best_reward >= beta_orig \
+          else EXACT
+        self.table_.store(
+            key,
+            (depth, MinimaxAiPlayer._to_table_score(best_reward, depth), flag, best_move),
+            depth
+        )
+        return best_move, best_reward
+
 ############### Joueur Humain ###############
 
 class PegPicker:
@@ -0,0 +1,88 @@
+from random import choice, random
+
+from const import *
+from oracle import oracle
+
+class RandomPolicy:
+    '''
+    Politique de simulation uniforme : chaque coup possible a la même probabilité.
+    '''
+    def choose(self, board, player, moves):
+        '''
+        Choisit le coup à jouer pendant une simulation.
+
+        Args:
+            board (Board): plateau dans sa position actuelle
+            player (int): joueur au trait
+            moves (List[Move]): coups possibles (non vide)
+
+        Returns:
+            Move: coup choisi
+        '''
+        return choice(moves)
+
+class HeavyPolicy(RandomPolicy):
+    '''
+    Politique de simulation guidée, calculée sur les masques de bits du plateau :
+    - un coup gagnant (arrivée sur la dernière ligne ou prise du dernier pion
+      adverse) est toujours joué ;
+    - sinon, un coureur adverse (pion pouvant gagner au coup suivant) est pris
+      s'il peut l'être ;
+    - sinon, le coup est tiré au hasard en favorisant les prises, surtout sur une
+      case que l'adversaire n'attaque pas, et les coups calmes vers une case non
+      attaquée.
+
+    Args:
+        win (bool): False pour ne pas jouer systématiquement les coups gagnants
+        defend (bool): False pour ne pas prendre systématiquement les coureurs
+        safe_capture (float): poids d'une prise sur une case non attaquée
+        capture (float): poids d'une prise sur une case attaquée
+        safe_move (float): poids d'un coup calme vers une case non attaquée
+                           (les autres coups ont un poids de 1 ; tous les
+                           poids doivent être strictement positifs)
+    '''
+    def __init__(self, win=True, defend=True, safe_capture=PLAYOUT_SAFE_CAPTURE,
+                 capture=PLAYOUT_CAPTURE, safe_move=PLAYOUT_SAFE_MOVE):
+        self.win_ = win
+        self.defend_ = defend
+        self.safe_capture_ = safe_capture
+        self.capture_ = capture
+        self.safe_move_ = safe_move
+
+    def choose(self, board, player, moves):
+        n = board.n
+        bits = board.bits
+        other = (PLAYER1+PLAYER2)-player
+        own, enemy = bits[player-1], bits[other-1]
+        moves_oracle = oracle(board.m, n)
+        attacks = moves_oracle.attacks(own, player)
+        # les masques indiquent si un parcours des coups est nécessaire
+        last_peg = enemy & (enemy-1) == 0
+        if self.win_ and (moves_oracle.runners(bits, player) or (last_peg and attacks & enemy)):
+            goal_row = 0 if player == PLAYER1 else board.m-1
+            for move in moves:
+                dest = move.dest
+                if dest.row == goal_row or (last_peg and enemy >> (dest.row*n + dest.col) & 1):
+                    return move
+        if self.defend_:
+            runners = moves_oracle.runners(bits, other)
+            if runners & attacks:
+                return choice([
+                    move for move in moves \
+                         if runners >> (move.dest.row*n + move.dest.col) & 1
+                ])
+        # tirage pondéré par rejet : un coup tiré uniformément est accepté avec une
+        # probabilité proportionnelle à son poids (quelques tirages en moyenne, sans
+        # calculer le poids de tous les coups)
+        attacked = moves_oracle.attacks(enemy, other)
+        safe_capture, capture, safe_move = self.safe_capture_, self.capture_, self.safe_move_
+        top = max(safe_move, 1, *((safe_capture, capture) if attacks & enemy else ()))
+        while True:
+            move = choice(moves)
+            bit = 1 << (move.dest.row*n + move.dest.col)
+            if bit & enemy:
+                weight = capture if bit & attacked else safe_capture
+            else:
+                weight = 1 if bit & attacked else safe_move
+            if random()*top < weight:
+                return move
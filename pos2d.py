@@ -1,9 +1,16 @@
+from functools import lru_cache
 from math import hypot
 
 class Pos2D:
     '''
     Position 2-dimensionnelle (soit (x, y), soit (ligne, colonne)).
 
+    Les positions sont immuables. Les cases des plateaux créés (cf. squares) sont
+    uniques : Pos2D(i, j) renvoie alors toujours le même objet, tiré d'un tableau
+    plat indexé par i*n + j et borné au plus grand plateau rencontré. Les autres
+    positions (hors plateau, différences de positions) sont de simples objets,
+    comparés par valeur. Le hash est un entier calculé une seule fois.
+
     Args:
         row (int): ligne/position verticale
         col (int): colonne/position horizontale
@@ -14,9 +21,73 @@ class Pos2D:
         row (int): référence vers y
         col (int): référence vers x
     '''
-    def __init__(self, row, col):
-        self.x_ = col
-        self.y_ = row
+    __slots__ = ('x_', 'y_', 'hash_')
+
+    # cases uniques, indexées par ligne*cols_ + colonne, pour 0 <= ligne < rows_
+    # et 0 <= colonne < cols_ (plus grand plateau passé à squares)
+    rows_ = 0
+    cols_ = 0
+    instances_ = []
+
+    def __new__(cls, row, col):
+        cols = cls.cols_
+        if 0 <= col < cols and 0 <= row < cls.rows_:
+            return cls.instances_[row*cols + col]
+        return cls.__create(row, col)
+
+    @classmethod
+    def __create(cls, row, col):
+        pos = super().__new__(cls)
+        pos.x_ = col
+        pos.y_ = row
+        pos.hash_ = hash((row, col))
+        return pos
+
+    @classmethod
+    def __grow(cls, rows, cols):
+        '''
+        Étend le tableau des cases uniques à un plateau de taille donnée, en
+        conservant les cases déjà créées.
+
+        Args:
+            rows (int): nombre de lignes du plateau
+            cols (int): nombre de colonnes du plateau
+        '''
+        rows, cols = max(rows, cls.rows_), max(cols, cls.cols_)
+        if (rows, cols) == (cls.rows_, cls.cols_):
+            return
+        cls.instances_ = [
+            Pos2D(i, j) if i < cls.rows_ and j < cls.cols_ else cls.__create(i, j)
+            for i in range(rows) for j in range(cols)
+        ]
+        cls.rows_ = rows
+        cls.cols_ = cols
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def squares(rows, cols):
+        '''
+        Table de toutes les cases d'un plateau de taille donnée.
+
+        Args:
+            rows (int): nombre de lignes du plateau
+            cols (int): nombre de colonnes du plateau
+
+        Returns:
+            Tuple[Pos2D]: la case (i, j) est à l'indice i*cols + j
+        '''
+        Pos2D.__grow(rows, cols)
+        return tuple(Pos2D(i, j) for i in range(rows) for j in range(cols))
+
+    def __reduce__(self):
+        # pickle doit repasser par __new__ pour retrouver les cases uniques
+        return (Pos2D, (self.y_, self.x_))
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
 
     @property
     def x(self):
@@ -50,26 +121,21 @@ class Pos2D:
           else hypot(delta.x, delta.y)
 
     def __eq__(self, other):
-        ''' Retourne self == other ''' 
-        return isinstance(other, Pos2D) and self.x == other.x and self.y == other.y
+        ''' Retourne self == other '''
+        return self is other or (isinstance(other, Pos2D)
+                                 and self.x_ == other.x_ and self.y_ == other.y_)
 
     def __sub__(self, other):
         ''' Retourne self - other '''
         if isinstance(other, tuple) and len(other) == 2:
-            other = Pos2D(other[1], other[0])
-        return Pos2D(
-            self.row - other.row,
-            self.col - other.col
-        )
+            return Pos2D(self.y_ - other[1], self.x_ - other[0])
+        return Pos2D(self.y_ - other.y_, self.x_ - other.x_)
 
     def __add__(self, other):
         ''' Retourne self + other '''
         if isinstance(other, tuple) and len(other) == 2:
-            other = Pos2D(other[1], other[0])
-        return Pos2D(
-            self.row + other.row,
-            self.col + other.col
-        )
+            return Pos2D(self.y_ + other[1], self.x_ + other[0])
+        return Pos2D(self.y_ + other.y_, self.x_ + other.x_)
 
     def __lt__(self, other):
         ''' Return self < other '''
@@ -80,6 +146,6 @@ class Pos2D:
 
     # Nécessaire pour mettre des Pos2D dans un dict ou un set
     # c.f. VALID_MOVES
-    def __hash__(self):  
-        return hash(str(self))
+    def __hash__(self):
+        return self.hash_
 
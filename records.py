@@ -0,0 +1,581 @@
+'''
+Enregistrement de positions et de parties.
+
+Positions : chaîne de type FEN, par exemple 'pppppp/pppppp/6/6/PPPPPP/PPPPPP w 0 1'
+(lignes de haut en bas séparées par '/', 'P' pour un pion de PLAYER1, 'p' pour
+un pion de PLAYER2, chiffres pour des cases vides consécutives), suivie du joueur au
+trait ('w', 'b' ou '-' pour PLAYER1), du nombre de coups depuis la dernière capture
+et du numéro du coup.
+
+Parties : fichier binaire composé d'un en-tête (GAMES_MAGIC, version) puis d'une
+suite d'enregistrements (petit-boutiste) :
+- taille du plateau, premier joueur, vainqueur (0 si inconnu), indicateurs
+  (RECORD_VALUES si les valeurs sont présentes), nombre de coups ;
+- position de départ : masques de bits des pions des deux joueurs (bit i*n + j) ;
+- coups : un entier de 16 bits par coup, case de départ * 3 + direction (indice
+  dans VALID_MOVES) ;
+- valeurs (facultatives) : un flottant de 32 bits par coup, valeur de la position
+  donnée par la recherche du joueur au trait (NaN si le coup n'a pas été cherché).
+Les fichiers de la version 1 (sans indicateurs ni valeurs) restent lisibles.
+La lecture se fait au fil de l'eau : les positions sont rejouées sur les masques
+de bits, et un Board n'est construit que sur demande.
+'''
+import os
+import struct
+import sys
+from array import array
+
+from board import Board
+from const import *
+from errors import BadFormatError
+from move import Move
+from pos2d import Pos2D
+
+GAMES_MAGIC = b'BTGR'
+GAMES_VERSION = 2
+FILE_HEADER = struct.Struct('<4sI')
+RECORD_HEADER = struct.Struct('<BBBBBI')
+# en-têtes des enregistrements selon la version du fichier
+RECORD_HEADERS = {1: struct.Struct('<BBBBI'), GAMES_VERSION: RECORD_HEADER}
+RECORD_VALUES = 0x01
+
+def encode_fen(rows, cols, white, black, player=PLAYER1, halfmove=0, fullmove=1):
+    '''
+    Construit la chaîne d'une position.
+
+    Args:
+        rows (int): nombre de lignes du plateau
+        cols (int): nombre de colonnes du plateau
+        white (int): masque des pions de PLAYER1 (bit i*cols + j)
+        black (int): masque des pions de PLAYER2
+        player (int): joueur au trait
+        halfmove (int): nombre de coups depuis la dernière capture
+        fullmove (int): numéro du coup
+
+    Returns:
+        str: position au format FEN
+    '''
+    lines = []
+    for i in range(rows):
+        line = []
+        empty = 0
+        for j in range(cols):
+            bit = 1 << (i*cols + j)
+            if not (white | black) & bit:
+                empty += 1
+                continue
+            if empty:
+                line.append(str(empty))
+                empty = 0
+            line.append('P' if white & bit else 'p')
+        if empty:
+            line.append(str(empty))
+        lines.append(''.join(line))
+    side = 'w' if player == PLAYER1 else 'b'
+    return f'{"/".join(lines)} {side} {halfmove} {fullmove}'
+
+def decode_fen(fen):
+    '''
+    Lit la chaîne d'une position.
+
+    Args:
+        fen (str): position au format FEN (seul le placement est obligatoire)
+
+    Returns:
+        Tuple[int,int,int,int,int]: (lignes, colonnes, masque des pions de PLAYER1,
+                                     masque des pions de PLAYER2, joueur au trait)
+
+    Raises:
+        BadFormatError: si la chaîne est incorrecte
+    '''
+    fields = fen.split()
+    if not fields:
+        raise BadFormatError(f'Position vide : "{fen}"')
+    rows = fields[0].split('/')
+    pegs = []  # (ligne, colonne, joueur)
+    cols = None
+    for i, line in enumerate(rows):
+        j = 0
+        empty = ''
+        for char in line:
+            if char.isdigit():
+                empty += char
+                continue
+            j += int(empty or 0)
+            empty = ''
+            if char == 'P':
+                pegs.append((i, j, PLAYER1))
+            elif char == 'p':
+                pegs.append((i, j, PLAYER2))
+            else:
+                raise BadFormatError(f'Caractère "{char}" inconnu dans "{fen}"')
+            j += 1
+        j += int(empty or 0)
+        if cols is None:
+            cols = j
+        elif j != cols:
+            raise BadFormatError(f'Lignes de longueurs différentes dans "{fen}"')
+    masks = [0, 0]
+    for i, j, player in pegs:
+        masks[player-1] |= 1 << (i*cols + j)
+    side = fields[1] if len(fields) > 1 else '-'
+    if side not in ('w', 'b', '-'):
+        raise BadFormatError(f'Joueur au trait "{side}" inconnu dans "{fen}"')
+    return len(rows), cols, masks[0], masks[1], PLAYER2 if side == 'b' else PLAYER1
+
+def board_masks(board):
+    '''
+    Args:
+        board (Board): plateau
+
+    Returns:
+        Tuple[int,int]: masques des pions de PLAYER1 et de PLAYER2
+    '''
+    n = board.n
+    masks = [0, 0]
+    for player in (PLAYER1, PLAYER2):
+        for pos in board.pegs[player-1]:
+            masks[player-1] |= 1 << (pos.row*n + pos.col)
+    return masks[0], masks[1]
+
+def board_from_masks(rows, cols, white, black, board_type=Board):
+    '''
+    Construit un plateau (sans historique) à partir des masques des pions.
+
+    Args:
+        rows (int): nombre de lignes du plateau
+        cols (int): nombre de colonnes du plateau
+        white (int): masque des pions de PLAYER1
+        black (int): masque des pions de PLAYER2
+        board_type (type): représentation du plateau
+
+    Returns:
+        Board: plateau correspondant
+    '''
+    board = board_type(rows, cols)
+    squares = Pos2D.squares(rows, cols)
+    for mask, add_peg in ((white, board.add_white_peg), (black, board.add_black_peg)):
+        while mask:
+            low = mask & -mask
+            add_peg(squares[low.bit_length()-1])
+            mask ^= low
+    return board
+
+def board_to_fen(board, player=None):
+    '''
+    Args:
+        board (Board): plateau
+        player (int): joueur au trait (par défaut, l'adversaire de l'auteur du
+                      dernier coup, ou PLAYER1 si aucun coup n'a été joué)
+
+    Returns:
+        str: position du plateau au format FEN
+    '''
+    history = board.history
+    if player is None:
+        player = PLAYER1 if not history \
+                         else (PLAYER1+PLAYER2)-history[-1].move.player
+    halfmove = 0
+    for entry in reversed(history):
+        if entry.captured:
+            break
+        halfmove += 1
+    white, black = board_masks(board)
+    return encode_fen(board.m, board.n, white, black, player, halfmove, len(history)//2 + 1)
+
+def board_from_fen(fen, board_type=Board):
+    '''
+    Args:
+        fen (str): position au format FEN
+        board_type (type): représentation du plateau
+
+    Returns:
+        Tuple[Board,int]: plateau (sans historique) et joueur au trait
+
+    Raises:
+        BadFormatError: si la chaîne est incorrecte
+    '''
+    rows, cols, white, black, player = decode_fen(fen)
+    return board_from_masks(rows, cols, white, black, board_type), player
+
+def encode_move(move, cols):
+    '''
+    Args:
+        move (Move): coup
+        cols (int): nombre de colonnes du plateau
+
+    Returns:
+        int: code du coup, case de départ * 3 + direction
+    '''
+    return 3*(move.src.row*cols + move.src.col) + move.dest.col - move.src.col + 1
+
+def decode_move(code, cols, player):
+    '''
+    Args:
+        code (int): code du coup (cf. encode_move)
+        cols (int): nombre de colonnes du plateau
+        player (int): joueur effectuant le coup
+
+    Returns:
+        Tuple[int,int]: indices des cases de départ et d'arrivée
+    '''
+    src, direction = divmod(code, 3)
+    return src, src + (-cols if player == PLAYER1 else cols) + direction-1
+
+class GameRecord:
+    '''
+    Partie enregistrée : position de départ et liste des coups.
+
+    Args:
+        rows (int): nombre de lignes du plateau
+        cols (int): nombre de colonnes du plateau
+        white (int): masque des pions de PLAYER1 dans la position de départ
+        black (int): masque des pions de PLAYER2 dans la position de départ
+        player (int): joueur jouant le premier coup
+        moves (array): codes des coups (cf. encode_move)
+        winner (int): vainqueur (None si inconnu)
+        values (array): valeur de chaque position selon la recherche du joueur au
+                        trait (None si aucune)
+    '''
+    def __init__(self, rows, cols, white, black, player, moves, winner=None,
+                 values=None):
+        self.m_ = rows
+        self.n_ = cols
+        self.white_ = white
+        self.black_ = black
+        self.player_ = player
+        self.moves_ = moves
+        self.winner_ = winner
+        self.values_ = values
+
+    @classmethod
+    def from_board(cls, board, winner=None, values=None, first_player=PLAYER1):
+        '''
+        Enregistre la partie jouée sur un plateau (position de départ retrouvée
+        en remontant l'historique, sans modifier le plateau).
+
+        Args:
+            board (Board): plateau dont l'historique contient la partie
+            winner (int): vainqueur (par défaut board.winner)
+            values (Iterable[float]): valeur de chaque position (None si aucune)
+            first_player (int): joueur ayant le trait dans la position de départ,
+                                utilisé si l'historique est vide (un plateau
+                                chargé d'une FEN peut commencer par PLAYER2)
+
+        Returns:
+            GameRecord: partie enregistrée
+        '''
+        n = board.n
+        masks = list(board_masks(board))
+        for entry in reversed(board.history):
+            move = entry.move
+            src = 1 << (move.src.row*n + move.src.col)
+            dest = 1 << (move.dest.row*n + move.dest.col)
+            masks[move.player-1] ^= src | dest
+            if entry.captured:
+                masks[2-move.player] |= dest
+        history = board.history
+        moves = array('H', (encode_move(entry.move, n) for entry in history))
+        player = history[0].move.player if history else first_player
+        return cls(
+            board.m, n, masks[0], masks[1], player, moves,
+            board.winner if winner is None else winner,
+            None if values is None else array('f', values)
+        )
+
+    @property
+    def m(self):
+        return self.m_
+
+    @property
+    def n(self):
+        return self.n_
+
+    @property
+    def white(self):
+        return self.white_
+
+    @property
+    def black(self):
+        return self.black_
+
+    @property
+    def player(self):
+        return self.player_
+
+    @property
+    def moves(self):
+        return self.moves_
+
+    @property
+    def winner(self):
+        return self.winner_
+
+    @property
+    def values(self):
+        return self.values_
+
+    def __len__(self):
+        return len(self.moves_)
+
+    def positions(self):
+        '''
+        Rejoue la partie sur les masques de bits, sans construire de plateau.
+
+        Returns:
+            Iterator[Tuple[int,int,int,int]]:
+                (masque de PLAYER1, masque de PLAYER2, joueur au trait, code du coup
+                joué) pour chaque position précédant un coup
+        '''
+        cols = self.n_
+        masks = [self.white_, self.black_]
+        player = self.player_
+        for code in self.moves_:
+            yield masks[0], masks[1], player, code
+            src, dest = decode_move(code, cols, player)
+            masks[player-1] ^= (1 << src) | (1 << dest)
+            masks[2-player] &= ~(1 << dest)
+            player = (PLAYER1+PLAYER2)-player
+
+    def board(self, ply=0, board_type=Board):
+        '''
+        Construit le plateau d'une position de la partie.
+
+        Args:
+            ply (int): nombre de coups joués depuis la position de départ
+            board_type (type): représentation du plateau
+
+        Returns:
+            Board: plateau après `ply` coups (historique compris)
+        '''
+        board = board_from_masks(self.m_, self.n_, self.white_, self.black_, board_type)
+        squares = Pos2D.squares(self.m_, self.n_)
+        player = self.player_
+        for code in self.moves_[:ply]:
+            src, dest = decode_move(code, self.n_, player)
+            board.move(Move(squares[src], squares[dest], player))
+            player = (PLAYER1+PLAYER2)-player
+        return board
+
+    def fen(self, ply=0):
+        '''
+        Args:
+            ply (int): nombre de coups joués depuis la position de départ
+
+        Returns:
+            str: position après `ply` coups au format FEN
+        '''
+        if not 0 <= ply <= len(self.moves_):
+            raise IndexError(f'La partie ne compte que {len(self.moves_)} coups')
+        cols = self.n_
+        masks = [self.white_, self.black_]
+        player = self.player_
+        # nombre de coups depuis la dernière prise, comme board_to_fen
+        halfmove = 0
+        for code in self.moves_[:ply]:
+            src, dest = decode_move(code, cols, player)
+            halfmove = 0 if masks[2-player] >> dest & 1 else halfmove+1
+            masks[player-1] ^= (1 << src) | (1 << dest)
+            masks[2-player] &= ~(1 << dest)
+            player = (PLAYER1+PLAYER2)-player
+        return encode_fen(self.m_, cols, masks[0], masks[1], player, halfmove, ply//2 + 1)
+
+class GameWriter:
+    '''
+    Écriture au fil de l'eau de parties dans un fichier binaire.
+
+    Args:
+        path (str): chemin du fichier
+        append (bool): True pour ajouter les parties à la fin du fichier existant
+
+    Raises:
+        BadFormatError: si le fichier existant n'est pas un fichier de parties de
+                        la version courante
+    '''
+    def __init__(self, path, append=False):
+        self.file_ = open(path, 'a+b' if append else 'wb')
+        if self.file_.tell() == 0:
+            self.file_.write(FILE_HEADER.pack(GAMES_MAGIC, GAMES_VERSION))
+            return
+        self.file_.seek(0)
+        try:
+            if _read_header(self.file_, path) is not RECORD_HEADER:
+                raise BadFormatError(f'Fichier de parties d\'une autre version : "{path}"')
+        except BadFormatError:
+            self.file_.close()
+            raise
+
+    def write(self, record):
+        '''
+        Ajoute une partie au fichier.
+
+        Args:
+            record (GameRecord/Board): partie, ou plateau dont l'historique
+                                       contient la partie
+        '''
+        if not isinstance(record, GameRecord):
+            record = GameRecord.from_board(record)
+        size = (record.m*record.n + 7) // 8
+        moves = array('H', record.moves)
+        values = None if record.values is None else array('f', record.values)
+        if values is not None and len(values) != len(moves):
+            raise ValueError('Il faut une valeur par coup')
+        if sys.byteorder != 'little':
+            moves.byteswap()
+            if values is not None:
+                values.byteswap()
+        flags = 0 if values is None else RECORD_VALUES
+        # un seul appel à write : un enregistrement interrompu reste en fin de fichier
+        self.file_.write(b''.join((
+            RECORD_HEADER.pack(
+                record.m, record.n, record.player, record.winner or 0, flags, len(moves)
+            ),
+            record.white.to_bytes(size, 'little'),
+            record.black.to_bytes(size, 'little'),
+            moves.tobytes(),
+            b'' if values is None else values.tobytes(),
+        )))
+
+    def flush(self):
+        '''
+        Écrit sur le disque les parties ajoutées depuis la dernière écriture.
+        '''
+        self.file_.flush()
+
+    def close(self):
+        self.file_.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+def _read_header(f, path):
+    '''
+    Lit l'en-tête d'un fichier de parties.
+
+    Args:
+        f (BinaryIO): fichier ouvert en lecture, au début
+        path (str): chemin du fichier (pour les messages d'erreur)
+
+    Returns:
+        struct.Struct: format des en-têtes d'enregistrement du fichier
+
+    Raises:
+        BadFormatError: si le fichier n'est pas un fichier de parties
+    '''
+    header = f.read(FILE_HEADER.size)
+    if len(header) == FILE_HEADER.size:
+        magic, version = FILE_HEADER.unpack(header)
+        if magic == GAMES_MAGIC and version in RECORD_HEADERS:
+            return RECORD_HEADERS[version]
+    raise BadFormatError(f'Fichier de parties invalide : "{path}"')
+
+def _read_record(f, record_header):
+    '''
+    Lit l'enregistrement suivant d'un fichier de parties.
+
+    Args:
+        f (BinaryIO): fichier ouvert en lecture
+        record_header (struct.Struct): format des en-têtes d'enregistrement
+
+    Returns:
+        GameRecord: partie lue (None en fin de fichier ou si l'enregistrement
+                    est incomplet)
+    '''
+    header = f.read(record_header.size)
+    if len(header) != record_header.size:
+        return None
+    fields = record_header.unpack(header)
+    rows, cols, player, winner = fields[:4]
+    flags, plies = fields[4:] if len(fields) == 6 else (0, fields[4])
+    size = (rows*cols + 7) // 8
+    length = 2*size + 2*plies + (4*plies if flags & RECORD_VALUES else 0)
+    data = f.read(length)
+    if len(data) != length:
+        return None
+    moves = array('H')
+    moves.frombytes(data[2*size:2*size + 2*plies])
+    values = None
+    if flags & RECORD_VALUES:
+        values = array('f')
+        values.frombytes(data[2*size + 2*plies:])
+    if sys.byteorder != 'little':
+        moves.byteswap()
+        if values is not None:
+            values.byteswap()
+    return GameRecord(
+        rows, cols,
+        int.from_bytes(data[:size], 'little'),
+        int.from_bytes(data[size:2*size], 'little'),
+        player, moves, winner or None, values
+    )
+
+def read_games(path):
+    '''
+    Lit au fil de l'eau les parties d'un fichier binaire.
+
+    Args:
+        path (str): chemin du fichier
+
+    Returns:
+        Iterator[GameRecord]: parties du fichier, dans l'ordre d'écriture
+
+    Raises:
+        BadFormatError: si le fichier est incorrect
+    '''
+    with open(path, 'rb') as f:
+        record_header = _read_header(f, path)
+        size = os.fstat(f.fileno()).st_size
+        while True:
+            start = f.tell()
+            record = _read_record(f, record_header)
+            if record is None:
+                if start != size:
+                    raise BadFormatError(f'Fichier de parties tronqué : "{path}"')
+                return
+            yield record
+
+def repair_games(path):
+    '''
+    Supprime l'éventuel enregistrement incomplet en fin de fichier (écriture
+    interrompue), pour pouvoir y ajouter de nouvelles parties.
+
+    Args:
+        path (str): chemin du fichier
+
+    Returns:
+        int: nombre de parties complètes du fichier
+
+    Raises:
+        BadFormatError: si le fichier n'est pas un fichier de parties
+    '''
+    with open(path, 'r+b') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return 0
+        record_header = _read_header(f, path)
+        count = 0
+        end = f.tell()
+        while _read_record(f, record_header) is not None:
+            count += 1
+            end = f.tell()
+        f.truncate(end)
+    return count
+
+def read_positions(path):
+    '''
+    Lit au fil de l'eau toutes les positions des parties d'un fichier, sans
+    construire de plateau.
+
+    Args:
+        path (str): chemin du fichier
+
+    Returns:
+        Iterator[Tuple[GameRecord,int,int,int,int]]:
+            (partie, masque de PLAYER1, masque de PLAYER2, joueur au trait, code du
+            coup joué) pour chaque position précédant un coup
+    '''
+    for record in read_games(path):
+        for white, black, player, code in record.positions():
+            yield record, white, black, player, code
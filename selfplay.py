@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+'''
+Génération de données d'apprentissage : parties MinimaxAiPlayer contre MonteCarlo,
+enregistrées avec, pour chaque position, le coup joué, la valeur donnée par la
+recherche et le résultat final.
+
+Usage : python selfplay.py DOSSIER -n 1000 [-w 4] [--depth 3] [--time 0.5]
+                           [--shard 256] [--random-plies 2] [--board FICHIER] [--seed 0]
+
+Les parties sont jouées dans un pool de processus et ajoutées, dans l'ordre de
+leur numéro, à des fichiers de parties (cf. records) de `shard` parties chacun :
+DOSSIER/games-00000.bin, DOSSIER/games-00001.bin, ... Au plus 2*workers parties
+sont en cours à la fois : la mémoire utilisée ne dépend pas du nombre de parties.
+
+Les couleurs et la graine aléatoire de la partie numéro k ne dépendent que de k
+et de la graine de la génération. Après une interruption, relancer la même
+commande reprend à la première partie absente (un enregistrement incomplet en
+fin de fichier est d'abord supprimé).
+'''
+import argparse
+import math
+import os
+import random
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from board import Board
+from breakthrough import Breakthrough
+from const import *
+from players import MinimaxAiPlayer, MonteCarlo, RandomAiPlayer
+from records import GameRecord, GameWriter, read_games, repair_games
+
+SHARD_NAME = 'games-{:05d}.bin'
+
+def shard_path(directory, shard):
+    '''
+    Args:
+        directory (str): dossier des données
+        shard (int): numéro du fichier
+
+    Returns:
+        str: chemin du fichier
+    '''
+    return os.path.join(directory, SHARD_NAME.format(shard))
+
+def game_seed(seed, idx):
+    '''
+    Args:
+        seed (int): graine de la génération
+        idx (int): numéro de la partie
+
+    Returns:
+        int: graine de la partie (indépendante du nombre de processus et des
+             parties déjà jouées)
+    '''
+    return random.Random(f'{seed}:{idx}').getrandbits(32)
+
+def play_selfplay_game(args):
+    '''
+    Joue la partie numéro `idx` (fonction exécutée dans le pool). Minimax a les
+    blancs aux parties paires. Les valeurs sont ramenées dans [-1, 1], du point de
+    vue du joueur au trait : score de minimax divisé par WIN, 2*p-1 pour une
+    proportion de victoires p de MonteCarlo, NaN pour les coups aléatoires de
+    l'ouverture.
+
+    Args:
+        args (Tuple): (idx, path, board_type, depth, time_budget, random_plies, seed)
+
+    Returns:
+        GameRecord: partie jouée, avec la valeur de chaque position
+    '''
+    idx, path, board_type, depth, time_budget, random_plies, seed = args
+    random.seed(seed)
+    game = Breakthrough(path, board_type=board_type,
+                        player_types=(RandomAiPlayer, RandomAiPlayer))
+    board = game.board
+    minimax_id = PLAYER1 if idx % 2 == 0 else PLAYER2
+    players = {
+        minimax_id: MinimaxAiPlayer(minimax_id, board, depth, time_budget=time_budget),
+        (PLAYER1+PLAYER2)-minimax_id: MonteCarlo(
+            (PLAYER1+PLAYER2)-minimax_id, board, time_budget=time_budget
+        ),
+    }
+    values = []
+    current = game.first_player
+    winner = None
+    try:
+        while winner is None:
+            possible_moves = board.possible_moves(current)
+            if not possible_moves:
+                winner = (PLAYER1+PLAYER2)-current
+                break
+            player = players[current]
+            if len(board.history) < random_plies:
+                move, value = random.choice(possible_moves), math.nan
+            elif current == minimax_id:
+                move, score = player.iterative_deepening(time_budget, depth)
+                value = max(-1., min(1., score/WIN))
+            else:
+                pct, move = player.carlo()
+                value = 2*pct - 1
+            board.move(move)
+            values.append(value)
+            winner = board.winner
+            current = (PLAYER1+PLAYER2)-current
+    finally:
+        for player in players.values():
+            close = getattr(player, 'close', None)
+            if close is not None:
+                close()
+    return GameRecord.from_board(board, winner, values, game.first_player)
+
+def generate_games(jobs, workers=1):
+    '''
+    Joue des parties au fil de l'eau, dans l'ordre des tâches. Au plus 2*workers
+    parties sont en cours ou en attente d'être consommées.
+
+    Args:
+        jobs (Iterable[Tuple]): arguments de play_selfplay_game
+        workers (int): nombre de processus (1 : tout dans ce processus)
+
+    Returns:
+        Iterator[GameRecord]: parties jouées
+    '''
+    if workers <= 1:
+        yield from map(play_selfplay_game, jobs)
+        return
+    executor = ProcessPoolExecutor(workers)
+    pending = deque()
+    try:
+        for job in jobs:
+            pending.append(executor.submit(play_selfplay_game, job))
+            if len(pending) >= 2*workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        # en cas d'interruption, les parties non commencées sont abandonnées
+        executor.shutdown(cancel_futures=True)
+
+def completed_games(directory, shard_games=SELFPLAY_SHARD_GAMES):
+    '''
+    Compte les parties déjà écrites, après suppression d'un éventuel
+    enregistrement incomplet.
+
+    Args:
+        directory (str): dossier des données
+        shard_games (int): nombre de parties par fichier
+
+    Returns:
+        int: nombre de parties complètes (numérotées de 0 à ce nombre - 1)
+    '''
+    total = 0
+    shard = 0
+    while os.path.exists(shard_path(directory, shard)):
+        count = repair_games(shard_path(directory, shard))
+        total += count
+        if count < shard_games:
+            break
+        shard += 1
+    return total
+
+def write_shards(records, directory, start=0, shard_games=SELFPLAY_SHARD_GAMES):
+    '''
+    Ajoute des parties aux fichiers du dossier : la partie numéro k va dans le
+    fichier k // shard_games. Chaque partie est écrite sur le disque dès qu'elle
+    est reçue.
+
+    Args:
+        records (Iterable[GameRecord]): parties numérotées à partir de `start`
+        directory (str): dossier des données
+        start (int): numéro de la première partie
+        shard_games (int): nombre de parties par fichier
+
+    Returns:
+        Iterator[int]: numéro de chaque partie écrite
+    '''
+    writer = None
+    shard = None
+    try:
+        for idx, record in enumerate(records, start):
+            if idx // shard_games != shard:
+                if writer is not None:
+                    writer.close()
+                shard = idx // shard_games
+                writer = GameWriter(shard_path(directory, shard), append=True)
+            writer.write(record)
+            writer.flush()
+            yield idx
+    finally:
+        if writer is not None:
+            writer.close()
+
+def selfplay(directory, games, workers=1, path=None, board_type=Board, depth=None,
+             time_budget=None, random_plies=SELFPLAY_RANDOM_PLIES,
+             shard_games=SELFPLAY_SHARD_GAMES, seed=0):
+    '''
+    Génère les parties manquantes pour atteindre `games` parties dans le dossier.
+    Les paramètres doivent être les mêmes d'une reprise à l'autre.
+
+    Args:
+        directory (str): dossier des données (créé si besoin)
+        games (int): nombre total de parties
+        workers (int): nombre de processus
+        path (str): chemin vers le plateau de départ (None pour le plateau par défaut)
+        board_type (type): représentation du plateau
+        depth (int): profondeur maximale de minimax (MinimaxAiPlayer.DEPTH par défaut)
+        time_budget (float): temps alloué par coup en secondes
+        random_plies (int): nombre de coups aléatoires en début de partie
+        shard_games (int): nombre de parties par fichier
+        seed (int): graine de la génération
+
+    Returns:
+        Iterator[int]: numéro de chaque partie écrite
+    '''
+    os.makedirs(directory, exist_ok=True)
+    start = completed_games(directory, shard_games)
+    depth = MinimaxAiPlayer.DEPTH if depth is None else depth
+    time_budget = ALLOWED_TIME_IN_S if time_budget is None else time_budget
+    jobs = (
+        (idx, path, board_type, depth, time_budget, random_plies, game_seed(seed, idx)) \
+        for idx in range(start, games)
+    )
+    return write_shards(generate_games(jobs, workers), directory, start, shard_games)
+
+def read_samples(directory):
+    '''
+    Lit au fil de l'eau les exemples de toutes les parties du dossier.
+
+    Args:
+        directory (str): dossier des données
+
+    Returns:
+        Iterator[Tuple[int,int,int,int,float,int]]:
+            (masque de PLAYER1, masque de PLAYER2, joueur au trait, code du coup
+            joué, valeur de la recherche, résultat) pour chaque position ; le
+            résultat vaut 1 si le joueur au trait a gagné, -1 s'il a perdu, 0 si
+            le vainqueur est inconnu
+    '''
+    shard = 0
+    while os.path.exists(shard_path(directory, shard)):
+        for record in read_games(shard_path(directory, shard)):
+            values = record.values or [math.nan]*len(record)
+            for (white, black, player, code), value in zip(record.positions(), values):
+                result = 0 if record.winner is None else \
+                         (1 if record.winner == player else -1)
+                yield white, black, player, code, value, result
+        shard += 1
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('directory', help='dossier des données')
+    parser.add_argument('-n', '--games', type=int, default=100)
+    parser.add_argument('-w', '--workers', type=int, default=1)
+    parser.add_argument('--depth', type=int, default=None, help='profondeur de minimax')
+    parser.add_argument('--time', type=float, default=None, help='temps par coup (s)')
+    parser.add_argument('--shard', type=int, default=SELFPLAY_SHARD_GAMES,
+                        help='nombre de parties par fichier')
+    parser.add_argument('--random-plies', type=int, default=SELFPLAY_RANDOM_PLIES)
+    parser.add_argument('--board', default=None, help='fichier du plateau de départ')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    written = 0
+    try:
+        for idx in selfplay(args.directory, args.games, args.workers, args.board,
+                            Board, args.depth, args.time, args.random_plies,
+                            args.shard, args.seed):
+            written += 1
+            print(f'\rpartie {idx+1}/{args.games}', end='', flush=True)
+    except KeyboardInterrupt:
+        pass
+    print(f'\n{written} parties écrites dans {args.directory}')
+
+if __name__ == '__main__':
+    main()
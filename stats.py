@@ -0,0 +1,191 @@
+import time
+
+class SearchStats:
+    '''
+    Statistiques d'une recherche (un appel à _play d'un joueur AI).
+
+    Les temps par phase ne sont mesurés que lorsque le joueur a un hook de
+    statistiques (AiPlayer.stats_hook) : sans hook, la recherche n'est pas
+    instrumentée et ne paie aucun surcoût.
+
+    Args:
+        player (int): joueur ayant effectué la recherche
+
+    Attributes:
+        player (int): joueur ayant effectué la recherche
+        move (Move): coup choisi
+        score (float): score du coup choisi (évaluation minimax ou proportion
+                       de victoires Monte-Carlo)
+        nodes (int): nombre de noeuds visités (minimax) ou de noeuds de l'arbre (UCT)
+        depth (int): profondeur maximale atteinte
+        branching_factor (float): facteur de branchement effectif, nodes^(1/depth)
+        cutoffs (int): nombre de coupures alpha-beta
+        rollouts (int): nombre de simulations Monte-Carlo
+        tt_hits (int): nombre de consultations fructueuses de la table des positions
+        tt_probes (int): nombre total de consultations de la table des positions
+        movegen_time (float): temps passé à générer les coups (en s)
+        make_unmake_time (float): temps passé à jouer et annuler les coups, hors
+                                  mise à jour de l'évaluation statique (en s)
+        eval_time (float): temps passé dans l'évaluation statique, lecture du score
+                           et mises à jour incrémentales de move/undo (en s)
+        total_time (float): durée totale de la recherche (en s)
+    '''
+    def __init__(self, player):
+        self.player = player
+        self.move = None
+        self.score = None
+        self.nodes = 0
+        self.depth = 0
+        self.cutoffs = 0
+        self.rollouts = 0
+        self.tt_hits = 0
+        self.tt_probes = 0
+        self.movegen_time = 0.
+        self.make_unmake_time = 0.
+        self.eval_time = 0.
+        self.total_time = 0.
+
+    @property
+    def branching_factor(self):
+        return self.nodes**(1/self.depth) if self.depth > 0 and self.nodes > 0 else 0.
+
+    def to_dict(self):
+        '''
+        Returns:
+            Dict: statistiques sous forme sérialisable (le coup est converti en str)
+        '''
+        return {
+            'player': self.player,
+            'move': None if self.move is None else str(self.move),
+            'score': self.score,
+            'nodes': self.nodes,
+            'depth': self.depth,
+            'branching_factor': self.branching_factor,
+            'cutoffs': self.cutoffs,
+            'rollouts': self.rollouts,
+            'tt_hits': self.tt_hits,
+            'tt_probes': self.tt_probes,
+            'movegen_time': self.movegen_time,
+            'make_unmake_time': self.make_unmake_time,
+            'eval_time': self.eval_time,
+            'total_time': self.total_time,
+        }
+
+    def __str__(self):
+        return (
+            f'{self.move} (score {self.score}) : {self.nodes} noeuds, '
+            f'profondeur {self.depth}, branchement {self.branching_factor:.2f}, '
+            f'{self.cutoffs} coupures, {self.rollouts} simulations, '
+            f'table {self.tt_hits}/{self.tt_probes}, '
+            f'coups {1000*self.movegen_time:.1f} ms, '
+            f'move/undo {1000*self.make_unmake_time:.1f} ms, '
+            f'évaluation {1000*self.eval_time:.1f} ms, '
+            f'total {1000*self.total_time:.1f} ms'
+        )
+
+class InstrumentedBoard:
+    '''
+    Enveloppe d'un plateau mesurant le temps passé dans possible_moves, move,
+    undo et l'évaluation statique. Tous les autres attributs sont ceux du plateau
+    enveloppé.
+
+    Les mises à jour incrémentales de l'évaluateur ont lieu dans move/undo du
+    plateau enveloppé : le temps de la recherche, l'évaluateur du plateau est
+    remplacé par un InstrumentedEvaluator, et le temps qu'il mesure est compté
+    dans eval_time et retiré de make_unmake_time. close() rend au plateau son
+    évaluateur.
+
+    Args:
+        board (Board): plateau à instrumenter
+        stats (SearchStats): statistiques dans lesquelles cumuler les temps
+    '''
+    def __init__(self, board, stats):
+        self.board_ = board
+        self.stats_ = stats
+        self.original_evaluator_ = board.evaluator
+        self.evaluator_ = None
+        if board.evaluator is not None:
+            self.evaluator_ = InstrumentedEvaluator(board.evaluator, stats)
+            board.attach_evaluator(self.evaluator_)
+
+    def __getattr__(self, name):
+        if name == 'board_':  # objet en cours de construction (copie, pickle)
+            raise AttributeError(name)
+        return getattr(self.board_, name)
+
+    @property
+    def board(self):
+        return self.board_
+
+    @property
+    def evaluator(self):
+        return self.evaluator_
+
+    def close(self):
+        '''
+        Rend au plateau enveloppé son évaluateur d'origine.
+        '''
+        if self.evaluator_ is not None:
+            self.board_.attach_evaluator(self.original_evaluator_)
+            self.evaluator_ = None
+
+    def possible_moves(self, player):
+        start = time.perf_counter()
+        moves = self.board_.possible_moves(player)
+        self.stats_.movegen_time += time.perf_counter() - start
+        return moves
+
+    def move(self, move):
+        stats = self.stats_
+        eval_time = stats.eval_time
+        start = time.perf_counter()
+        self.board_.move(move)
+        stats.make_unmake_time += time.perf_counter() - start - (stats.eval_time - eval_time)
+
+    def undo(self):
+        stats = self.stats_
+        eval_time = stats.eval_time
+        start = time.perf_counter()
+        self.board_.undo()
+        stats.make_unmake_time += time.perf_counter() - start - (stats.eval_time - eval_time)
+
+class InstrumentedEvaluator:
+    '''
+    Enveloppe d'un évaluateur mesurant le temps passé à lire le score et à le
+    tenir à jour (move, undo).
+
+    Args:
+        evaluator (Evaluator): évaluateur à instrumenter
+        stats (SearchStats): statistiques dans lesquelles cumuler les temps
+    '''
+    def __init__(self, evaluator, stats):
+        self.evaluator_ = evaluator
+        self.stats_ = stats
+
+    def __getattr__(self, name):
+        if name == 'evaluator_':
+            raise AttributeError(name)
+        return getattr(self.evaluator_, name)
+
+    @property
+    def score(self):
+        start = time.perf_counter()
+        score = self.evaluator_.score
+        self.stats_.eval_time += time.perf_counter() - start
+        return score
+
+    def score_for(self, player):
+        start = time.perf_counter()
+        score = self.evaluator_.score_for(player)
+        self.stats_.eval_time += time.perf_counter() - start
+        return score
+
+    def move(self, src, dest, player):
+        start = time.perf_counter()
+        self.evaluator_.move(src, dest, player)
+        self.stats_.eval_time += time.perf_counter() - start
+
+    def undo(self, src, dest, player, captured):
+        start = time.perf_counter()
+        self.evaluator_.undo(src, dest, player, captured)
+        self.stats_.eval_time += time.perf_counter() - start
@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+'''
+Tables de finales : résultat exact (victoire ou défaite et nombre de coups) de
+toutes les positions où chaque joueur a au plus K pions, calculé hors ligne.
+
+Usage : python tablebase.py FICHIER [--size 6 6] [--pegs 2]
+
+Chaque coup fait avancer un pion d'une ligne : la somme des avancements des pions
+(le potentiel) augmente strictement à chaque coup sans capture, et une capture
+diminue le nombre de pions. Les positions sont donc résolues par nombre total de
+pions croissant puis par potentiel décroissant : les positions atteintes en un coup
+sont toujours déjà résolues (induction arrière). Il n'y a pas de nulle : un
+joueur sans coup possible perd.
+
+Format du fichier : un en-tête (signature TABLEBASE_MAGIC, version, taille du
+plateau, K) suivi d'un octet par position : bit de poids fort à 1 si le joueur au
+trait gagne, 7 bits de poids faible égaux au nombre de coups avant la fin de la
+partie plus un (0 : position non valide). Les positions sont rangées par nombre
+de pions (a, b) des deux joueurs, puis par rang combinatoire des ensembles de
+cases occupées, puis par joueur au trait.
+'''
+import argparse
+import mmap
+import struct
+from itertools import combinations
+from math import comb
+
+from const import *
+from errors import BadFormatError
+
+TABLEBASE_MAGIC = b'BTTB'
+TABLEBASE_VERSION = 1
+HEADER = struct.Struct('<4sHHHH')
+# distance maximale représentable sur 7 bits
+MAX_DISTANCE = 126
+
+class TablebaseLayout:
+    '''
+    Correspondance entre positions et indices dans la table.
+
+    Args:
+        squares (int): nombre de cases du plateau
+        pegs (int): nombre maximal de pions par joueur
+
+    Attributes:
+        size (int): nombre d'entrées de la table
+    '''
+    def __init__(self, squares, pegs):
+        self.binomials_ = [
+            [comb(s, k) for k in range(pegs+1)] for s in range(squares+1)
+        ]
+        self.offsets_ = {}
+        offset = 0
+        for a in range(1, pegs+1):
+            for b in range(1, pegs+1):
+                self.offsets_[(a, b)] = offset
+                offset += comb(squares, a) * comb(squares, b) * 2
+        self.squares_ = squares
+        self.size_ = offset
+
+    @property
+    def size(self):
+        return self.size_
+
+    def rank(self, squares):
+        '''
+        Rang d'un ensemble de cases parmi les ensembles de même taille (système
+        combinatoire de numération).
+
+        Args:
+            squares (Sequence[int]): indices des cases, triés par ordre croissant
+
+        Returns:
+            int: rang, entre 0 et C(nombre de cases, len(squares)) - 1
+        '''
+        binomials = self.binomials_
+        return sum(binomials[s][k+1] for k, s in enumerate(squares))
+
+    def index(self, white, black, player):
+        '''
+        Args:
+            white (Sequence[int]): cases des pions de PLAYER1, triées
+            black (Sequence[int]): cases des pions de PLAYER2, triées
+            player (int): joueur au trait
+
+        Returns:
+            int: indice de la position dans la table
+        '''
+        return self.offsets_[(len(white), len(black))] + 2*(
+            self.rank(white)*comb(self.squares_, len(black)) + self.rank(black)
+        ) + player-1
+
+def encode(win, distance):
+    '''
+    Args:
+        win (bool): True si le joueur au trait gagne
+        distance (int): nombre de coups avant la fin de la partie
+
+    Returns:
+        int: octet stocké dans la table
+    '''
+    return (0x80 if win else 0) | (min(distance, MAX_DISTANCE)+1)
+
+def decode(value):
+    '''
+    Opération inverse de encode.
+
+    Args:
+        value (int): octet non nul de la table
+
+    Returns:
+        Tuple[bool,int]: victoire du joueur au trait et nombre de coups
+    '''
+    return value & 0x80 != 0, (value & 0x7f)-1
+
+def _solve_position(table, layout, rows, cols, white, black, player):
+    '''
+    Calcule le résultat d'une position dont tous les successeurs sont résolus.
+
+    Args:
+        table (bytearray): table en cours de construction
+        layout (TablebaseLayout): organisation de la table
+        rows (int): nombre de lignes du plateau
+        cols (int): nombre de colonnes du plateau
+        white (Tuple[int]): cases des pions de PLAYER1, triées
+        black (Tuple[int]): cases des pions de PLAYER2, triées
+        player (int): joueur au trait
+
+    Returns:
+        int: octet à stocker
+    '''
+    if player == PLAYER1:
+        own, other, forward, goal = white, black, -1, 0
+    else:
+        own, other, forward, goal = black, white, 1, rows-1
+    next_player = (PLAYER1+PLAYER2)-player
+    own_set, other_set = set(own), set(other)
+    best_win = None  # plus courte victoire
+    longest_loss = None  # plus longue défaite
+    for src in own:
+        i, j = divmod(src, cols)
+        row = i+forward
+        for dj in (-1, 0, 1):
+            col = j+dj
+            if not 0 <= col < cols:
+                continue
+            dest = row*cols + col
+            if dest in own_set:
+                continue
+            captured = dest in other_set
+            if captured and dj == 0:
+                continue
+            if row == goal or (captured and len(other) == 1):
+                return encode(True, 1)
+            moved = tuple(sorted(dest if s == src else s for s in own))
+            remaining = tuple(s for s in other if s != dest) if captured else other
+            if player == PLAYER1:
+                idx = layout.index(moved, remaining, next_player)
+            else:
+                idx = layout.index(remaining, moved, next_player)
+            win, distance = decode(table[idx])
+            if not win:
+                if best_win is None or distance+1 < best_win:
+                    best_win = distance+1
+            elif longest_loss is None or distance+1 > longest_loss:
+                longest_loss = distance+1
+    if best_win is not None:
+        return encode(True, best_win)
+    # sans aucun coup, le joueur au trait déclare forfait
+    return encode(False, 0 if longest_loss is None else longest_loss)
+
+def solve(rows, cols, pegs=TABLEBASE_PEGS):
+    '''
+    Résout toutes les positions d'au plus `pegs` pions par joueur.
+
+    Args:
+        rows (int): nombre de lignes du plateau
+        cols (int): nombre de colonnes du plateau
+        pegs (int): nombre maximal de pions par joueur
+
+    Returns:
+        bytearray: table (cf. TablebaseLayout et encode)
+    '''
+    squares = rows*cols
+    layout = TablebaseLayout(squares, pegs)
+    table = bytearray(layout.size)
+    # un pion sur sa ligne d'arrivée signifie que la partie est finie
+    white_squares = range(cols, squares)
+    black_squares = range(0, squares-cols)
+    sections = sorted(
+        ((a, b) for a in range(1, pegs+1) for b in range(1, pegs+1)), key=sum
+    )
+    for a, b in sections:
+        by_potential = {}
+        for white in combinations(white_squares, a):
+            white_potential = sum(rows-1 - s//cols for s in white)
+            for black in combinations(black_squares, b):
+                if not set(white).isdisjoint(black):
+                    continue
+                potential = white_potential + sum(s//cols for s in black)
+                by_potential.setdefault(potential, []).append((white, black))
+        for potential in sorted(by_potential, reverse=True):
+            for white, black in by_potential[potential]:
+                for player in (PLAYER1, PLAYER2):
+                    table[layout.index(white, black, player)] = _solve_position(
+                        table, layout, rows, cols, white, black, player
+                    )
+    return table
+
+def write_tablebase(path, rows, cols, pegs, table):
+    '''
+    Écrit une table de finales.
+
+    Args:
+        path (str): chemin du fichier
+        rows (int): nombre de lignes du plateau
+        cols (int): nombre de colonnes du plateau
+        pegs (int): nombre maximal de pions par joueur
+        table (bytearray): table renvoyée par solve
+    '''
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(TABLEBASE_MAGIC, TABLEBASE_VERSION, rows, cols, pegs))
+        f.write(table)
+
+class Tablebase:
+    '''
+    Table de finales projetée en mémoire.
+
+    Args:
+        path (str): chemin du fichier
+
+    Attributes:
+        path (str): chemin du fichier
+        m (int): nombre de lignes du plateau
+        n (int): nombre de colonnes du plateau
+        pegs (int): nombre maximal de pions par joueur
+
+    Raises:
+        BadFormatError: si le fichier n'est pas une table de finales
+    '''
+    def __init__(self, path):
+        self.path_ = path
+        with open(path, 'rb') as f:
+            try:
+                self.mmap_ = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:  # fichier vide : rien à projeter
+                raise BadFormatError(f'Table de finales vide : "{path}"') from None
+        if len(self.mmap_) < HEADER.size:
+            self.mmap_.close()
+            raise BadFormatError(f'Table de finales invalide : "{path}"')
+        magic, version, self.m_, self.n_, self.pegs_ = HEADER.unpack_from(self.mmap_)
+        self.layout_ = TablebaseLayout(self.m_*self.n_, self.pegs_)
+        if magic != TABLEBASE_MAGIC or version != TABLEBASE_VERSION \
+           or len(self.mmap_) != HEADER.size + self.layout_.size:
+            self.mmap_.close()
+            raise BadFormatError(f'Table de finales invalide : "{path}"')
+
+    def __reduce__(self):
+        # la projection n'est pas transmissible : le fichier est rouvert
+        return (Tablebase, (self.path_,))
+
+    @property
+    def path(self):
+        return self.path_
+
+    @property
+    def m(self):
+        return self.m_
+
+    @property
+    def n(self):
+        return self.n_
+
+    @property
+    def pegs(self):
+        return self.pegs_
+
+    def close(self):
+        '''
+        Ferme la projection du fichier.
+        '''
+        self.mmap_.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def probe(self, board, player):
+        '''
+        Cherche le résultat exact d'une position non finale.
+
+        Args:
+            board (Board): plateau dans sa position actuelle
+            player (int): joueur au trait
+
+        Returns:
+            Tuple[bool,int]: True si `player` gagne, et nombre de coups avant la fin
+                             de la partie (None si la position n'est pas couverte)
+        '''
+        if board.m != self.m_ or board.n != self.n_ or board.nb_pegs > 2*self.pegs_:
+            return None
+        n = self.n_
+        white, black = (
+            sorted(pos.row*n + pos.col for pos in pegs) for pegs in board.pegs
+        )
+        if not (0 < len(white) <= self.pegs_ and 0 < len(black) <= self.pegs_):
+            return None
+        value = self.mmap_[HEADER.size + self.layout_.index(white, black, player)]
+        return None if value == 0 else decode(value)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('output', help='fichier de la table')
+    parser.add_argument('--size', type=int, nargs=2, default=[DEFAULT_SIZE, DEFAULT_SIZE],
+                        metavar=('LIGNES', 'COLONNES'))
+    parser.add_argument('--pegs', type=int, default=TABLEBASE_PEGS)
+    args = parser.parse_args()
+    rows, cols = args.size
+    table = solve(rows, cols, args.pegs)
+    write_tablebase(args.output, rows, cols, args.pegs, table)
+    print(f'{sum(1 for value in table if value)} positions écrites dans {args.output}')
+
+if __name__ == '__main__':
+    main()
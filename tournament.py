@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+'''
+Confrontation sans affichage de deux joueurs AI sur un grand nombre de parties.
+
+Usage : python tournament.py minimax random -n 100 -w 8 [--board FICHIER] [--bitboard]
+                             [--book BIBLIOTHEQUE] [--tablebase TABLE]
+'''
+import argparse
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from math import log10
+
+from board import Board
+from breakthrough import Breakthrough
+from const import *
+from players import GreedyAiPlayer, MinimaxAiPlayer, MonteCarlo, RandomAiPlayer
+
+PLAYER_TYPES = {
+    'random': RandomAiPlayer,
+    'greedy': GreedyAiPlayer,
+    'minimax': MinimaxAiPlayer,
+    'montecarlo': MonteCarlo,
+}
+
+class GameResult:
+    '''
+    Résultat d'une partie.
+
+    Args:
+        winner (int): PLAYER1 ou PLAYER2
+        plies (int): nombre de coups joués
+        latencies (List[List[float]]): durée (en s) de chaque coup de chaque joueur
+    '''
+    def __init__(self, winner, plies, latencies):
+        self.winner_ = winner
+        self.plies_ = plies
+        self.latencies_ = latencies
+
+    @property
+    def winner(self):
+        return self.winner_
+
+    @property
+    def plies(self):
+        return self.plies_
+
+    @property
+    def latencies(self):
+        return self.latencies_
+
+def play_game(player_types, path=None, board_type=Board, seed=None):
+    '''
+    Joue une partie complète sans affichage. Un joueur qui n'a plus aucun coup
+    possible perd la partie.
+
+    Args:
+        player_types (Tuple[type,type]): types (ou fabriques) de PLAYER1 et PLAYER2
+        path (str): chemin vers le plateau de départ (None pour le plateau par défaut)
+        board_type (type): représentation du plateau (Board ou BitBoard)
+        seed (int): graine du générateur aléatoire (None : pas de réinitialisation)
+
+    Returns:
+        GameResult: résultat de la partie
+    '''
+    if seed is not None:
+        random.seed(seed)
+    game = Breakthrough(path, board_type=board_type, player_types=player_types)
+    board = game.board
+    latencies = [[], []]
+    current = game.first_player
+    winner = None
+    try:
+        while winner is None:
+            if not board.possible_moves(current):
+                winner = (PLAYER1+PLAYER2)-current
+                break
+            start = time.perf_counter()
+            game.players[current-1].play()
+            latencies[current-1].append(time.perf_counter() - start)
+            winner = board.winner
+            current = (PLAYER1+PLAYER2)-current
+    finally:
+        for player in game.players:
+            close = getattr(player, 'close', None)
+            if close is not None:
+                close()
+    return GameResult(winner, len(board.history), latencies)
+
+def _play_match_game(args):
+    '''
+    Joue la partie numéro `idx` d'un match (fonction exécutée dans le pool).
+    Les couleurs alternent : le premier joueur a les blancs aux parties paires.
+
+    Args:
+        args (Tuple): (idx, first, second, path, board_type, seed)
+
+    Returns:
+        Tuple[int,GameResult]: indice de la partie et son résultat
+    '''
+    idx, first, second, path, board_type, seed = args
+    player_types = (first, second) if idx % 2 == 0 else (second, first)
+    return idx, play_game(player_types, path, board_type, seed)
+
+class MatchReport:
+    '''
+    Statistiques d'un match entre deux joueurs, du point de vue du premier.
+
+    Args:
+        names (Tuple[str,str]): noms des deux joueurs
+
+    Attributes:
+        games (int): nombre de parties jouées
+        wins (List[int]): nombre de victoires de chaque joueur
+        win_rate (float): proportion de victoires du premier joueur
+        elo (float): estimation de l'écart Elo du premier joueur sur le second
+        mean_plies (float): longueur moyenne d'une partie (en coups)
+        mean_latency (List[float]): durée moyenne d'un coup de chaque joueur (en s)
+        max_latency (List[float]): durée maximale d'un coup de chaque joueur (en s)
+    '''
+    def __init__(self, names):
+        self.names_ = names
+        self.wins_ = [0, 0]
+        self.white_wins_ = [0, 0]
+        self.plies_ = []
+        self.latencies_ = [[], []]
+
+    def add(self, idx, result):
+        '''
+        Ajoute le résultat de la partie numéro `idx` du match.
+
+        Args:
+            idx (int): indice de la partie (le premier joueur est blanc si idx est pair)
+            result (GameResult): résultat de la partie
+        '''
+        # contenders[c] : couleur (PLAYER1 ou PLAYER2) du joueur c dans cette partie
+        contenders = (PLAYER1, PLAYER2) if idx % 2 == 0 else (PLAYER2, PLAYER1)
+        for c, color in enumerate(contenders):
+            if result.winner == color:
+                self.wins_[c] += 1
+                if color == PLAYER1:
+                    self.white_wins_[c] += 1
+            self.latencies_[c].extend(result.latencies[color-1])
+        self.plies_.append(result.plies)
+
+    @property
+    def games(self):
+        return len(self.plies_)
+
+    @property
+    def wins(self):
+        return self.wins_
+
+    @property
+    def win_rate(self):
+        return self.wins_[0]/self.games if self.games else 0.
+
+    @property
+    def elo(self):
+        score = self.win_rate
+        if score <= 0.:
+            return NEG_INF
+        if score >= 1.:
+            return POS_INF
+        return -400*log10(1/score - 1)
+
+    @property
+    def mean_plies(self):
+        return sum(self.plies_)/len(self.plies_) if self.plies_ else 0.
+
+    @property
+    def mean_latency(self):
+        return [sum(l)/len(l) if l else 0. for l in self.latencies_]
+
+    @property
+    def max_latency(self):
+        return [max(l) if l else 0. for l in self.latencies_]
+
+    def summary(self):
+        '''
+        Résumé lisible du match.
+
+        Returns:
+            str: statistiques du match sur plusieurs lignes
+        '''
+        lines = [
+            f'{self.names_[0]} vs {self.names_[1]}: {self.games} parties',
+            f'  victoires : {self.wins_[0]} - {self.wins_[1]} '
+            f'(dont avec les blancs : {self.white_wins_[0]} - {self.white_wins_[1]})',
+            f'  taux de victoire de {self.names_[0]} : {self.win_rate:.3f}',
+            f'  écart Elo estimé : {self.elo:+.0f}',
+            f'  longueur moyenne : {self.mean_plies:.1f} coups',
+        ]
+        for name, mean, worst in zip(self.names_, self.mean_latency, self.max_latency):
+            lines.append(
+                f'  {name} : {1000*mean:.1f} ms/coup en moyenne, {1000*worst:.1f} ms au pire'
+            )
+        return '\n'.join(lines)
+
+def run_match(first, second, games, workers=1, path=None, board_type=Board,
+              names=None, seed=None):
+    '''
+    Fait jouer `games` parties entre deux joueurs en alternant les couleurs,
+    réparties sur un pool de processus.
+
+    Args:
+        first (type): type (ou fabrique picklable) du premier joueur
+        second (type): type (ou fabrique picklable) du second joueur
+        games (int): nombre de parties
+        workers (int): nombre de processus (1 : tout dans ce processus)
+        path (str): chemin vers le plateau de départ (None pour le plateau par défaut)
+        board_type (type): représentation du plateau (Board ou BitBoard)
+        names (Tuple[str,str]): noms des joueurs dans le rapport
+        seed (int): graine permettant de rejouer le même match
+
+    Returns:
+        MatchReport: statistiques du match
+    '''
+    if names is None:
+        names = (getattr(first, '__name__', str(first)),
+                 getattr(second, '__name__', str(second)))
+    rng = random.Random(seed)
+    jobs = [
+        (idx, first, second, path, board_type, rng.getrandbits(32)) \
+        for idx in range(games)
+    ]
+    report = MatchReport(names)
+    if workers <= 1:
+        results = map(_play_match_game, jobs)
+        for idx, result in results:
+            report.add(idx, result)
+    else:
+        with ProcessPoolExecutor(workers) as executor:
+            for idx, result in executor.map(_play_match_game, jobs):
+                report.add(idx, result)
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('first', choices=PLAYER_TYPES)
+    parser.add_argument('second', choices=PLAYER_TYPES)
+    parser.add_argument('-n', '--games', type=int, default=10)
+    parser.add_argument('-w', '--workers', type=int, default=1)
+    parser.add_argument('--board', default=None, help='fichier du plateau de départ')
+    parser.add_argument('--bitboard', action='store_true', help='utiliser BitBoard')
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--book', default=None,
+                        help="bibliothèque d'ouvertures de minimax et montecarlo")
+    parser.add_argument('--tablebase', default=None, help='table de finales de minimax')
+    args = parser.parse_args()
+    if args.bitboard:
+        from bitboard import BitBoard
+        board_type = BitBoard
+    else:
+        board_type = Board
+    first, second = PLAYER_TYPES[args.first], PLAYER_TYPES[args.second]
+    if args.book is not None:
+        from book import OpeningBook
+        book = OpeningBook(args.book)
+        first, second = (
+            partial(player_type, book=book) \
+            if player_type in (MinimaxAiPlayer, MonteCarlo) else player_type \
+            for player_type in (first, second)
+        )
+    if args.tablebase is not None:
+        from tablebase import Tablebase
+        tablebase = Tablebase(args.tablebase)
+        first, second = (
+            partial(player_type, tablebase=tablebase) \
+            if player_type is MinimaxAiPlayer \
+            or getattr(player_type, 'func', None) is MinimaxAiPlayer else player_type \
+            for player_type in (first, second)
+        )
+    report = run_match(
+        first, second, args.games,
+        args.workers, args.board, board_type, (args.first, args.second), args.seed
+    )
+    print(report.summary())
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+from const import TT_SIZE
+
+class TranspositionTable:
+    '''
+    Table de transposition de taille fixe indexée par clé de Zobrist.
+
+    Chaque clé est rangée dans la case `key % size`. En cas de collision, l'entrée
+    en place est remplacée si elle date d'une recherche précédente ou si la
+    nouvelle entrée a été calculée à une profondeur au moins aussi grande : la
+    mémoire utilisée reste bornée et les résultats les plus coûteux sont gardés.
+
+    Args:
+        size (int): nombre de cases de la table
+
+    Attributes:
+        size (int): nombre de cases de la table
+        hits (int): nombre de consultations fructueuses
+        probes (int): nombre total de consultations
+    '''
+    def __init__(self, size=TT_SIZE):
+        self.size_ = size
+        self.keys_ = [None] * size
+        self.values_ = [None] * size
+        self.depths_ = [0] * size
+        self.ages_ = [0] * size
+        self.age_ = 0
+        self.hits_ = 0
+        self.probes_ = 0
+
+    @property
+    def size(self):
+        return self.size_
+
+    @property
+    def hits(self):
+        return self.hits_
+
+    @property
+    def probes(self):
+        return self.probes_
+
+    def new_search(self):
+        '''
+        Signale le début d'une nouvelle recherche : les entrées existantes
+        deviennent prioritaires au remplacement.
+        '''
+        self.age_ += 1
+
+    def clear(self):
+        '''
+        Vide la table.
+        '''
+        self.keys_ = [None] * self.size_
+        self.values_ = [None] * self.size_
+
+    def probe(self, key):
+        '''
+        Cherche la valeur associée à une clé.
+
+        Args:
+            key (int): clé de Zobrist de la position
+
+        Returns:
+            object: valeur stockée ou None si la clé n'est pas dans la table
+        '''
+        self.probes_ += 1
+        idx = key % self.size_
+        if self.keys_[idx] != key:
+            return None
+        self.hits_ += 1
+        self.ages_[idx] = self.age_
+        return self.values_[idx]
+
+    def store(self, key, value, depth=0):
+        '''
+        Associe une valeur à une clé si la politique de remplacement le permet.
+
+        Args:
+            key (int): clé de Zobrist de la position
+            value (object): valeur à stocker
+            depth (int): profondeur de recherche ayant produit la valeur
+
+        Returns:
+            bool: True si la valeur a été stockée et False sinon
+        '''
+        idx = key % self.size_
+        if self.keys_[idx] is not None and self.ages_[idx] == self.age_ \
+           and depth < self.depths_[idx]:
+            return False
+        self.keys_[idx] = key
+        self.values_[idx] = value
+        self.depths_[idx] = depth
+        self.ages_[idx] = self.age_
+        return True
+
+    def __len__(self):
+        return self.size_ - self.keys_.count(None)
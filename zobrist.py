@@ -0,0 +1,28 @@
+from functools import lru_cache
+from random import Random
+
+from const import ZOBRIST_SEED
+
+@lru_cache(maxsize=None)
+def zobrist_keys(rows, cols):
+    '''
+    Génère (une seule fois par taille de plateau) les clés de Zobrist d'un plateau.
+    Le générateur est initialisé de manière déterministe pour que les clés soient
+    identiques d'un processus à l'autre (et donc utilisables dans des fichiers).
+
+    Args:
+        rows (int): nombre de lignes du plateau
+        cols (int): nombre de colonnes du plateau
+
+    Returns:
+        Tuple[Tuple[Tuple[int]],int]:
+            paire (clés, clé de trait) où clés[player-1][i*cols + j] est la clé de
+            64 bits d'un pion de `player` en case (i, j) et où la clé de trait est
+            ajoutée à chaque coup joué
+    '''
+    rng = Random(ZOBRIST_SEED ^ (rows << 16) ^ cols)
+    keys = tuple(
+        tuple(rng.getrandbits(64) for _ in range(rows*cols)) \
+        for player in range(2)
+    )
+    return keys, rng.getrandbits(64)